@@ -12,34 +12,70 @@ Features
 * SQLite-backed persistence — survives restarts.
 """
 
+import itertools
 import logging
+import math
 import sqlite3
+import time
 import uuid
+from collections import deque
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Transaction IDs: a per-process prefix plus a monotonic counter.  The prefix
+# keeps IDs unique across restarts (transactions are upserted by ID in SQLite)
+# while avoiding a uuid4() call per transaction.
+_TXN_ID_PREFIX = uuid.uuid4().hex[:12]
+_txn_counter = itertools.count()
+
+
+def _next_txn_id(account_id: str) -> str:
+    """Return a new process-unique transaction ID for *account_id*."""
+    return f"{account_id}:{_TXN_ID_PREFIX}:{next(_txn_counter)}"
+
+
+def _bet_result_amounts(stake: float, odds: float, result: str) -> tuple[float, float]:
+    """
+    Return ``(winnings, losses)`` for a settled bet.
+
+    Pure numeric kernel shared by the single and batch settlement paths;
+    the balance moves by ``winnings - losses``.
+    """
+    if result == "won":
+        return stake * (odds - 1.0), 0.0
+    if result == "lost":
+        return 0.0, stake
+    return 0.0, 0.0  # void / push
+
 
 # ---------------------------------------------------------------------------
 # Data classes
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class AccountTransaction:
     """Records a single financial event on a sportsbook account."""
 
+    # Fields read by the reporting paths come first in the slot layout
+    amount: float           # always positive; direction implied by txn_type
+    txn_type: str           # "deposit" | "withdrawal" | "bet_win" | "bet_loss" | "bet_void"
     id: str
     account_id: str
-    txn_type: str           # "deposit" | "withdrawal" | "bet_win" | "bet_loss" | "bet_void"
-    amount: float           # always positive; direction implied by txn_type
     description: str = ""
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)   # POSIX epoch seconds
 
+    @property
+    def timestamp_dt(self) -> datetime:
+        """The transaction time as a timezone-aware UTC datetime."""
+        return datetime.fromtimestamp(self.timestamp, timezone.utc)
 
-@dataclass
+
+@dataclass(slots=True)
 class SportsbookAccount:
     """
     Represents a single sportsbook account.
@@ -58,32 +94,57 @@ class SportsbookAccount:
         True when the book has limited/restricted the account.
     is_gubbed:
         True when the account has been gubbed (bonus offers removed).
+    transactions:
+        Transaction history. When capped (``deque(maxlen=N)``) only the most
+        recent N are kept; balance and bet totals still cover all of them.
     """
 
+    # Hot numeric/flag fields first so summary and health scans touch the
+    # front of the slot layout; keyword-only so ``name`` stays positional.
+    balance: float = field(default=0.0, kw_only=True)
+    # Running bet totals, kept in step with ``transactions`` so summary() is O(1)
+    _wins_total: float = field(default=0.0, init=False, repr=False)
+    _losses_total: float = field(default=0.0, init=False, repr=False)
+    # Transactions ever recorded; unlike len(transactions) it keeps counting
+    # past a max_history cap.
+    _txn_count: int = field(default=0, init=False, repr=False)
+    is_limited: bool = field(default=False, kw_only=True)
+    is_gubbed: bool = field(default=False, kw_only=True)
+    max_bet: float | None = field(default=None, kw_only=True)
     name: str
-    account_id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    balance: float = 0.0
-    max_bet: float | None = None
-    is_limited: bool = False
-    is_gubbed: bool = False
+    account_id: str = field(default_factory=lambda: uuid.uuid4().hex)
     notes: str = ""
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
-    transactions: list[AccountTransaction] = field(default_factory=list)
+    # Unbounded unless created with deque(maxlen=N) (see AccountTracker max_history)
+    transactions: deque[AccountTransaction] = field(default_factory=deque)
+
+    def __post_init__(self) -> None:
+        self._txn_count = len(self.transactions)
+
+    def _track(self, txn: AccountTransaction) -> None:
+        """Append *txn* to the history and fold it into the running totals."""
+        if txn.txn_type == "bet_win":
+            self._wins_total += txn.amount
+        elif txn.txn_type == "bet_loss":
+            self._losses_total += txn.amount
+        self.transactions.append(txn)
+        self._txn_count += 1
 
     def deposit(self, amount: float, description: str = "") -> AccountTransaction:
         """Record a deposit and update the balance."""
         if amount <= 0:
             raise ValueError(f"Deposit amount must be positive, got {amount}")
         txn = AccountTransaction(
-            id=str(uuid.uuid4()),
+            id=_next_txn_id(self.account_id),
             account_id=self.account_id,
             txn_type="deposit",
             amount=amount,
             description=description,
         )
         self.balance += amount
-        self.transactions.append(txn)
-        logger.info("Account %s (%s) deposit +%.2f → balance=%.2f", self.name, self.account_id, amount, self.balance)
+        self._track(txn)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Account %s (%s) deposit +%.2f → balance=%.2f", self.name, self.account_id, amount, self.balance)
         return txn
 
     def withdraw(self, amount: float, description: str = "") -> AccountTransaction:
@@ -95,17 +156,36 @@ class SportsbookAccount:
                 f"Insufficient balance on {self.name}: requested {amount:.2f}, have {self.balance:.2f}"
             )
         txn = AccountTransaction(
-            id=str(uuid.uuid4()),
+            id=_next_txn_id(self.account_id),
             account_id=self.account_id,
             txn_type="withdrawal",
             amount=amount,
             description=description,
         )
         self.balance -= amount
-        self.transactions.append(txn)
-        logger.info("Account %s (%s) withdrawal -%.2f → balance=%.2f", self.name, self.account_id, amount, self.balance)
+        self._track(txn)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Account %s (%s) withdrawal -%.2f → balance=%.2f", self.name, self.account_id, amount, self.balance)
         return txn
 
+    def _bet_txn(
+        self, stake: float, odds: float, result: str, winnings: float, losses: float
+    ) -> AccountTransaction:
+        """Build the transaction recording one settled bet (not yet tracked)."""
+        if result == "won":
+            txn_type, amount, verb = "bet_win", winnings, "won"
+        elif result == "lost":
+            txn_type, amount, verb = "bet_loss", losses, "lost"
+        else:  # void / push
+            txn_type, amount, verb = "bet_void", 0.0, "voided"
+        return AccountTransaction(
+            id=_next_txn_id(self.account_id),
+            account_id=self.account_id,
+            txn_type=txn_type,
+            amount=amount,
+            description=f"Bet {verb} — stake {stake:.2f} @ {odds}",
+        )
+
     def apply_bet_result(
         self, stake: float, odds: float, result: str
     ) -> AccountTransaction:
@@ -121,44 +201,70 @@ class SportsbookAccount:
         result:
             "won", "lost", or "void".
         """
-        if result == "won":
-            profit = stake * (odds - 1.0)
-            txn = AccountTransaction(
-                id=str(uuid.uuid4()),
-                account_id=self.account_id,
-                txn_type="bet_win",
-                amount=profit,
-                description=f"Bet won — stake {stake:.2f} @ {odds}",
+        winnings, losses = _bet_result_amounts(stake, odds, result)
+        txn = self._bet_txn(stake, odds, result, winnings, losses)
+        self.balance += winnings - losses
+        self._track(txn)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Account %s bet result=%s stake=%.2f odds=%.2f → balance=%.2f",
+                self.name, result, stake, odds, self.balance,
             )
-            self.balance += profit
-        elif result == "lost":
-            txn = AccountTransaction(
-                id=str(uuid.uuid4()),
-                account_id=self.account_id,
-                txn_type="bet_loss",
-                amount=stake,
-                description=f"Bet lost — stake {stake:.2f} @ {odds}",
+        return txn
+
+    def apply_bet_results_batch(
+        self,
+        stakes: Sequence[float],
+        odds: Sequence[float],
+        results: Sequence[str],
+        record_detail: bool = True,
+    ) -> int:
+        """
+        Apply many bet outcomes in one pass (e.g. when replaying a bet log).
+
+        Equivalent to calling :meth:`apply_bet_result` for each
+        ``(stake, odds, result)`` triple, but the balance is updated once
+        and a single log line is emitted for the whole batch.
+
+        Parameters
+        ----------
+        stakes, odds, results:
+            Parallel sequences of equal length.
+        record_detail:
+            When False, only the balance and running totals are updated and
+            no per-bet :class:`AccountTransaction` is kept.
+
+        Returns
+        -------
+        The number of bets applied.
+        """
+        if not len(stakes) == len(odds) == len(results):
+            raise ValueError(
+                f"Batch length mismatch: stakes={len(stakes)} odds={len(odds)} results={len(results)}"
             )
-            self.balance -= stake
-        else:  # void / push
-            txn = AccountTransaction(
-                id=str(uuid.uuid4()),
-                account_id=self.account_id,
-                txn_type="bet_void",
-                amount=0.0,
-                description=f"Bet voided — stake {stake:.2f} @ {odds}",
+        wins = 0.0
+        losses = 0.0
+        for stake, price, result in zip(stakes, odds, results):
+            won, lost = _bet_result_amounts(stake, price, result)
+            wins += won
+            losses += lost
+            if record_detail:
+                self.transactions.append(self._bet_txn(stake, price, result, won, lost))
+                self._txn_count += 1
+        self.balance += wins - losses
+        self._wins_total += wins
+        self._losses_total += losses
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Account %s batch of %d bet results: +%.2f / -%.2f → balance=%.2f",
+                self.name, len(results), wins, losses, self.balance,
             )
-        self.transactions.append(txn)
-        logger.info(
-            "Account %s bet result=%s stake=%.2f odds=%.2f → balance=%.2f",
-            self.name, result, stake, odds, self.balance,
-        )
-        return txn
+        return len(results)
 
     def summary(self) -> dict[str, Any]:
         """Return a summary dict for reporting."""
-        wins = sum(t.amount for t in self.transactions if t.txn_type == "bet_win")
-        losses = sum(t.amount for t in self.transactions if t.txn_type == "bet_loss")
+        wins = self._wins_total
+        losses = self._losses_total
         return {
             "name": self.name,
             "account_id": self.account_id,
@@ -168,7 +274,7 @@ class SportsbookAccount:
             "net_betting_pnl": round(wins - losses, 2),
             "is_limited": self.is_limited,
             "is_gubbed": self.is_gubbed,
-            "transaction_count": len(self.transactions),
+            "transaction_count": self._txn_count,
         }
 
 
@@ -192,8 +298,16 @@ class AccountTracker:
     [{'name': 'DraftKings', ...}, {'name': 'PrizePicks', ...}]
     """
 
-    def __init__(self, db_conn: sqlite3.Connection | None = None):
+    def __init__(
+        self,
+        db_conn: sqlite3.Connection | None = None,
+        max_history: int | None = None,
+    ):
+        # Per-account cap on in-memory transaction history (None = unbounded)
+        self._max_history = max_history
         self._accounts: dict[str, SportsbookAccount] = {}
+        # Lowercase name -> first registered account with that name
+        self._accounts_by_name: dict[str, SportsbookAccount] = {}
         self._db = db_conn
 
         # Restore from database if available
@@ -220,6 +334,7 @@ class AccountTracker:
                 is_gubbed=bool(row["is_gubbed"]),
                 notes=row["notes"],
                 created_at=datetime.fromisoformat(row["created_at"]),
+                transactions=deque(maxlen=self._max_history),
             )
             # Restore transactions
             for txn_row in load_transactions(self._db, account.account_id):
@@ -229,10 +344,29 @@ class AccountTracker:
                     txn_type=txn_row["txn_type"],
                     amount=txn_row["amount"],
                     description=txn_row["description"],
-                    timestamp=datetime.fromisoformat(txn_row["timestamp"]),
+                    timestamp=datetime.fromisoformat(txn_row["timestamp"]).timestamp(),
                 )
-                account.transactions.append(txn)
-            self._accounts[account.account_id] = account
+                account._track(txn)
+            self._register(account)
+
+    def _register(self, account: SportsbookAccount) -> None:
+        """Insert *account* into the ID and name indexes."""
+        previous = self._accounts.pop(account.account_id, None)
+        if previous is not None:
+            self._unindex_name(previous)
+        self._accounts[account.account_id] = account
+        self._accounts_by_name.setdefault(account.name.lower(), account)
+
+    def _unindex_name(self, account: SportsbookAccount) -> None:
+        """Drop *account* from the name index, promoting the next same-named account."""
+        name_lower = account.name.lower()
+        if self._accounts_by_name.get(name_lower) is not account:
+            return
+        del self._accounts_by_name[name_lower]
+        for acc in self._accounts.values():
+            if acc.name.lower() == name_lower:
+                self._accounts_by_name[name_lower] = acc
+                break
 
     def _persist_account(self, account: SportsbookAccount) -> None:
         """Write account state to SQLite."""
@@ -281,12 +415,14 @@ class AccountTracker:
             name=name,
             balance=initial_balance,
             max_bet=max_bet,
+            transactions=deque(maxlen=self._max_history),
         )
         if account_id:
             account.account_id = account_id
-        self._accounts[account.account_id] = account
+        self._register(account)
         self._persist_account(account)
-        logger.info("Added account: %s (id=%s) balance=%.2f", name, account.account_id, initial_balance)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Added account: %s (id=%s) balance=%.2f", name, account.account_id, initial_balance)
         return account
 
     def get_account(self, account_id: str) -> SportsbookAccount | None:
@@ -295,11 +431,7 @@ class AccountTracker:
 
     def get_account_by_name(self, name: str) -> SportsbookAccount | None:
         """Return the first account whose name matches (case-insensitive)."""
-        name_lower = name.lower()
-        for acc in self._accounts.values():
-            if acc.name.lower() == name_lower:
-                return acc
-        return None
+        return self._accounts_by_name.get(name.lower())
 
     def list_accounts(self) -> list[SportsbookAccount]:
         """Return all registered accounts."""
@@ -308,12 +440,13 @@ class AccountTracker:
     def remove_account(self, account_id: str) -> bool:
         """Remove an account. Returns True if found and removed."""
         if account_id in self._accounts:
-            del self._accounts[account_id]
+            self._unindex_name(self._accounts.pop(account_id))
             if self._db is not None:
                 self._db.execute("DELETE FROM account_transactions WHERE account_id = ?", (account_id,))
                 self._db.execute("DELETE FROM sportsbook_accounts WHERE account_id = ?", (account_id,))
                 self._db.commit()
-            logger.info("Removed account id=%s", account_id)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Removed account id=%s", account_id)
             return True
         return False
 
@@ -347,13 +480,29 @@ class AccountTracker:
     # ------------------------------------------------------------------
 
     def total_balance(self) -> float:
-        """Return the sum of balances across all registered accounts."""
-        return round(sum(acc.balance for acc in self._accounts.values()), 2)
+        """
+        Return the sum of balances across all registered accounts.
+
+        Accumulated exactly with :func:`math.fsum`; round at display time.
+        """
+        return math.fsum(acc.balance for acc in self._accounts.values())
 
     def account_summary(self) -> list[dict[str, Any]]:
         """Return a list of summary dicts for all accounts."""
         return [acc.summary() for acc in self._accounts.values()]
 
+    @staticmethod
+    def _health_flags(acc: SportsbookAccount) -> list[str]:
+        """Return the attention flags raised by a single account."""
+        flags = []
+        if acc.is_limited:
+            flags.append("limited")
+        if acc.is_gubbed:
+            flags.append("gubbed")
+        if acc.balance < 10.0:
+            flags.append("low_balance")
+        return flags
+
     def health_report(self) -> list[dict[str, Any]]:
         """
         Return accounts that may need attention:
@@ -361,13 +510,23 @@ class AccountTracker:
         """
         flagged = []
         for acc in self._accounts.values():
-            flags = []
-            if acc.is_limited:
-                flags.append("limited")
-            if acc.is_gubbed:
-                flags.append("gubbed")
-            if acc.balance < 10.0:
-                flags.append("low_balance")
+            flags = self._health_flags(acc)
             if flags:
                 flagged.append({**acc.summary(), "flags": flags})
         return flagged
+
+    def full_report(self) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """
+        Return ``(account_summary(), health_report())`` in a single pass.
+
+        Each account's summary is built once and shared by both lists.
+        """
+        summaries = []
+        flagged = []
+        for acc in self._accounts.values():
+            summary = acc.summary()
+            summaries.append(summary)
+            flags = self._health_flags(acc)
+            if flags:
+                flagged.append({**summary, "flags": flags})
+        return summaries, flagged
@@ -1,8 +1,15 @@
+import asyncio
+import contextlib
 from abc import ABC, abstractmethod
 from typing import Any
 
 
 class SportsbookBroker(ABC):
+    # Caps this broker's in-flight requests across every job and the
+    # optimizer; _build_brokers sets it from BROKER_MAX_INFLIGHT. None means
+    # unbounded.
+    inflight_limit: asyncio.Semaphore | None = None
+
     @abstractmethod
     async def get_odds(self, sport: str, event_ids: list[str]) -> dict[str, Any]:
         """Fetch current odds for given events."""
@@ -14,3 +21,32 @@ class SportsbookBroker(ABC):
     @abstractmethod
     async def check_bet_status(self, bet_id: str) -> dict[str, Any]:
         """Check if a bet has been settled and return outcome."""
+
+    async def check_bet_statuses(self, bet_ids: list[str]) -> dict[str, dict[str, Any] | BaseException]:
+        """
+        Check several bets at once and return their outcomes keyed by bet id.
+
+        The default polls check_bet_status concurrently, each lookup holding
+        a slot of :attr:`inflight_limit`; brokers with a bulk endpoint should
+        override it (and hold a slot around their own request). A lookup
+        that raised maps to its exception, so one bad id doesn't hide the
+        others.
+        """
+
+        async def _check(bet_id: str) -> dict[str, Any]:
+            async with broker_slot(self):
+                return await self.check_bet_status(bet_id)
+
+        results = await asyncio.gather(*(_check(bet_id) for bet_id in bet_ids), return_exceptions=True)
+        return dict(zip(bet_ids, results))
+
+
+def broker_slot(broker: Any) -> contextlib.AbstractAsyncContextManager:
+    """
+    Return the async context manager guarding one request to *broker*.
+
+    That is the broker's :attr:`~SportsbookBroker.inflight_limit`, or a
+    no-op for brokers without one.
+    """
+    limit = getattr(broker, "inflight_limit", None)
+    return limit if limit is not None else contextlib.nullcontext()
@@ -40,12 +40,31 @@ class DraftKingsBroker(SportsbookBroker):
         "SOCCER": "soccer",
     }
 
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 3.0):
         if not _DK_AVAILABLE:
             msg = "lukhed-sports is required: pip install lukhed-sports"
             raise ImportError(msg)
         # DkSportsbook handles geo-location internally
         self.client = DkSportsbook()
+        # league -> (monotonic fetch time, game lines); reused for cache_ttl
+        # seconds so several lookups in the same tick share one roundtrip.
+        self._cache_ttl = cache_ttl
+        self._cache: dict[str, tuple[float, list]] = {}
+
+    async def _game_lines(self, league: str) -> list:
+        """Return game lines for *league*, served from the TTL cache when fresh."""
+        now = time.monotonic()
+        cached = self._cache.get(league)
+        if cached is not None and now - cached[0] < self._cache_ttl:
+            return cached[1]
+        loop = asyncio.get_event_loop()
+        lines = await loop.run_in_executor(
+            None,  # uses the default ThreadPoolExecutor
+            self.client.get_game_lines_for_league,
+            league,
+        )
+        self._cache[league] = (now, lines)
+        return lines
 
     async def get_odds(self, sport: str, event_ids: list[str]) -> dict[str, Any]:
         """
@@ -53,21 +72,19 @@ class DraftKingsBroker(SportsbookBroker):
         Returns: { event_id: game_data_dict }
 
         The synchronous lukhed-sports call is offloaded to a thread pool
-        executor to avoid blocking the asyncio event loop.
+        executor to avoid blocking the asyncio event loop, and league
+        responses are cached for ``cache_ttl`` seconds.
         """
-        league = self.LEAGUE_MAP.get(sport.upper(), sport.lower())
-        loop = asyncio.get_event_loop()
+        # Canonical upper-case names hit directly; only normalise on a miss.
+        league = self.LEAGUE_MAP.get(sport) or self.LEAGUE_MAP.get(sport.upper(), sport.lower())
         try:
-            lines = await loop.run_in_executor(
-                None,  # uses the default ThreadPoolExecutor
-                self.client.get_game_lines_for_league,
-                league,
-            )
+            lines = await self._game_lines(league)
             if event_ids:
+                wanted = frozenset(event_ids)
                 return {
                     game["event_id"]: game
                     for game in lines
-                    if game.get("event_id") in event_ids
+                    if game.get("event_id") in wanted
                 }
             # Return all if no filter
             return {game["event_id"]: game for game in lines}
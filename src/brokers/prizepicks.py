@@ -1,15 +1,33 @@
 ﻿import time
+import random
 import logging
 import asyncio
 from typing import Any, ClassVar
 
 import httpx
+import orjson
 
 from .base import SportsbookBroker
 
 logger = logging.getLogger(__name__)
 
 _HTTP_TOO_MANY_REQUESTS = 429
+_MAX_BACKOFF_SECONDS = 30.0
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1.
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# Keep sockets warm between polling cycles so repeat fetches skip the
+# TCP/TLS handshake.
+_CONNECTION_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=30.0,
+)
 
 
 class PrizePicksBroker(SportsbookBroker):
@@ -82,7 +100,13 @@ class PrizePicksBroker(SportsbookBroker):
         if self.csrf_token:
             headers["X-CSRF-Token"] = self.csrf_token
 
-        self.client = httpx.AsyncClient(headers=headers, cookies=cookies, timeout=15.0)
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            cookies=cookies,
+            timeout=15.0,
+            http2=_HTTP2_AVAILABLE,
+            limits=_CONNECTION_LIMITS,
+        )
 
     async def __aenter__(self) -> "PrizePicksBroker":
         return self
@@ -90,28 +114,39 @@ class PrizePicksBroker(SportsbookBroker):
     async def __aexit__(self, *args: object) -> None:
         await self.aclose()
 
+    def _backoff(self, attempt: int) -> float:
+        """
+        Seconds to wait before retry *attempt* (1-based).
+
+        Exponential in the attempt number, capped at _MAX_BACKOFF_SECONDS,
+        with jitter in [50%, 100%] so concurrent callers don't retry in lockstep.
+        """
+        base = min(self.retry_delay * (2 ** (attempt - 1)), _MAX_BACKOFF_SECONDS)
+        return base * (0.5 + random.random() * 0.5)
+
     async def _get_with_retry(self, url: str, params: dict) -> dict:
         """GET with exponential-backoff retry on rate-limit (429) or server errors."""
         for attempt in range(1, self.max_retries + 1):
             try:
                 resp = await self.client.get(url, params=params)
                 if resp.status_code == _HTTP_TOO_MANY_REQUESTS:
-                    wait = self.retry_delay * attempt
-                    logger.warning(f"PrizePicks rate-limited. Retrying in {wait}s...")
+                    wait = self._backoff(attempt)
+                    logger.warning("PrizePicks rate-limited. Retrying in %.1fs...", wait)
                     await asyncio.sleep(wait)
                     continue
                 resp.raise_for_status()
-                return resp.json()
+                # orjson parses the raw bytes directly (no str decode step)
+                return orjson.loads(resp.content)
             except httpx.HTTPStatusError:
                 logger.exception("PrizePicks HTTP error (attempt %s)", attempt)
                 if attempt == self.max_retries:
                     raise
-                await asyncio.sleep(self.retry_delay)
+                await asyncio.sleep(self._backoff(attempt))
             except httpx.RequestError:
                 logger.exception("PrizePicks request error (attempt %s)", attempt)
                 if attempt == self.max_retries:
                     raise
-                await asyncio.sleep(self.retry_delay)
+                await asyncio.sleep(self._backoff(attempt))
         return {}
 
     async def get_odds(self, sport: str, _event_ids: list[str]) -> dict[str, Any]:
@@ -122,7 +157,10 @@ class PrizePicksBroker(SportsbookBroker):
         _event_ids are ignored (PrizePicks groups by league, not individual games),
         but the game_id is included in each result so callers can filter downstream.
         """
-        league_id = self.LEAGUE_MAP.get(sport.upper())
+        # Canonical upper-case names hit directly; only normalise on a miss.
+        league_id = self.LEAGUE_MAP.get(sport)
+        if league_id is None:
+            league_id = self.LEAGUE_MAP.get(sport.upper())
         if league_id is None:
             logger.warning("Unknown PrizePicks league for sport '%s'. Defaulting to NBA (7).", sport)
             league_id = 7
@@ -136,29 +174,33 @@ class PrizePicksBroker(SportsbookBroker):
             return {}
 
         # Build player lookup from 'included'
-        players: dict[str, str] = {}
-        for item in data.get("included", []):
-            if item.get("type") == "new_player":
-                players[item["id"]] = item["attributes"].get("name", "Unknown")
+        players: dict[str, str] = {
+            item["id"]: item["attributes"].get("name", "Unknown")
+            for item in data.get("included", ())
+            if item.get("type") == "new_player"
+        }
 
         odds_data: dict[str, Any] = {}
-        for proj in data.get("data", []):
+        # Bind hot lookups to locals once; the loop runs per projection.
+        players_get = players.get
+        for proj in data.get("data", ()):
             try:
                 proj_id = proj["id"]
-                attrs = proj["attributes"]
-                player_id = proj["relationships"]["new_player"]["data"]["id"]
-                game_rel = proj["relationships"].get("game", {}).get("data") or {}
+                attrs_get = proj["attributes"].get
+                rels = proj["relationships"]
+                player_id = rels["new_player"]["data"]["id"]
+                game_rel = rels.get("game", {}).get("data") or {}
 
                 odds_data[proj_id] = {
-                    "player": players.get(player_id, "Unknown"),
+                    "player": players_get(player_id, "Unknown"),
                     "player_id": player_id,
-                    "stat_type": attrs.get("stat_type"),
-                    "line": float(attrs.get("line_score", 0)),
-                    "odds": attrs.get("odds"),          # decimal odds if provided
+                    "stat_type": attrs_get("stat_type"),
+                    "line": float(attrs_get("line_score", 0)),
+                    "odds": attrs_get("odds"),          # decimal odds if provided
                     "game_id": game_rel.get("id"),
-                    "description": attrs.get("description", ""),
-                    "start_time": attrs.get("start_time"),
-                    "is_promo": attrs.get("is_promo", False),
+                    "description": attrs_get("description", ""),
+                    "start_time": attrs_get("start_time"),
+                    "is_promo": attrs_get("is_promo", False),
                 }
             except (KeyError, TypeError, ValueError) as e:
                 logger.debug("Skipping malformed projection %s: %s", proj.get("id"), e)
@@ -7,15 +7,23 @@ Implements:
   - Integration hook for RiskManager (check budget before placing a bet)
 """
 
+import bisect
 import logging
 import sqlite3
+import sys
+from collections import OrderedDict
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from datetime import date, datetime, timezone, timedelta
 from enum import Enum
+from functools import lru_cache
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Number of reference dates whose summary() result is kept.
+_SUMMARY_CACHE_SIZE = 8
+
 
 # ---------------------------------------------------------------------------
 # Enumerations
@@ -28,13 +36,26 @@ class BudgetPeriod(str, Enum):
     WEEKLY = "weekly"
     MONTHLY = "monthly"
 
+    @property
+    def slot(self) -> int:
+        """Position in declaration order; BudgetManager's budget list is indexed by it."""
+        return _PERIOD_SLOT[self]
+
+
+_PERIOD_SLOT: dict[BudgetPeriod, int] = {period: i for i, period in enumerate(BudgetPeriod)}
+
+
+def _utcnow() -> datetime:
+    """Return the current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
 
 # ---------------------------------------------------------------------------
 # Data classes
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True)
 class BudgetEntry:
     """A single spending record against a budget."""
 
@@ -42,10 +63,16 @@ class BudgetEntry:
     amount: float
     sport: str
     sportsbook: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime = field(default_factory=_utcnow)
+    # Canonical key for per-sport bucketing, case-folded once at creation.
+    sport_upper: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Interned: a handful of sports recur across every entry and bucket key.
+        self.sport_upper = sys.intern(self.sport.upper())
 
 
-@dataclass
+@dataclass(slots=True)
 class Budget:
     """
     A budget constraint for a given period.
@@ -63,32 +90,54 @@ class Budget:
     period: BudgetPeriod
     limit: float
     sport_limits: dict[str, float] = field(default_factory=dict)
-
-    def period_start(self, reference: date | None = None) -> date:
-        """Return the start date of the current budget period."""
-        ref = reference or date.today()
-        if self.period == BudgetPeriod.DAILY:
-            return ref
-        if self.period == BudgetPeriod.WEEKLY:
-            # Monday of the current week
-            return ref - timedelta(days=ref.weekday())
-        # Monthly
-        return ref.replace(day=1)
-
-    def period_end(self, reference: date | None = None) -> date:
-        """Return the last date of the current budget period (inclusive)."""
-        start = self.period_start(reference)
-        if self.period == BudgetPeriod.DAILY:
-            return start
-        if self.period == BudgetPeriod.WEEKLY:
-            return start + timedelta(days=6)
-        # Monthly
-        # Move to first day of next month, then subtract one day
-        if start.month == 12:
-            next_month = start.replace(year=start.year + 1, month=1, day=1)
-        else:
-            next_month = start.replace(month=start.month + 1, day=1)
-        return next_month - timedelta(days=1)
+    # sport_limits keyed by upper-cased sport; the first spelling wins when
+    # two keys differ only in case.
+    sport_limits_upper: dict[str, float] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        upper: dict[str, float] = {}
+        for sport, limit in self.sport_limits.items():
+            upper.setdefault(sport.upper(), limit)
+        self.sport_limits_upper = upper
+
+    def period_start(self, reference: date) -> date:
+        """Return the start date of the budget period containing *reference*."""
+        return _period_start(self.period, reference)
+
+    def period_end(self, reference: date) -> date:
+        """Return the last date (inclusive) of the period containing *reference*."""
+        return _period_end(self.period, reference)
+
+
+# Period boundaries are pure functions of (period, reference date), so they
+# are memoised; the gating path asks for the same few dates over and over.
+
+
+@lru_cache(maxsize=4096)
+def _period_start(period: BudgetPeriod, ref: date) -> date:
+    if period == BudgetPeriod.DAILY:
+        return ref
+    if period == BudgetPeriod.WEEKLY:
+        # Monday of the current week
+        return ref - timedelta(days=ref.weekday())
+    # Monthly
+    return ref.replace(day=1)
+
+
+@lru_cache(maxsize=4096)
+def _period_end(period: BudgetPeriod, ref: date) -> date:
+    start = _period_start(period, ref)
+    if period == BudgetPeriod.DAILY:
+        return start
+    if period == BudgetPeriod.WEEKLY:
+        return start + timedelta(days=6)
+    # Monthly
+    # Move to first day of next month, then subtract one day
+    if start.month == 12:
+        next_month = start.replace(year=start.year + 1, month=1, day=1)
+    else:
+        next_month = start.replace(month=start.month + 1, day=1)
+    return next_month - timedelta(days=1)
 
 
 # ---------------------------------------------------------------------------
@@ -113,8 +162,24 @@ class BudgetManager:
     """
 
     def __init__(self, db_conn: sqlite3.Connection | None = None):
-        self._budgets: dict[BudgetPeriod, Budget] = {}
+        self._budgets: list[Budget | None] = [None] * len(BudgetPeriod)
+        # Entries kept in date order, with their dates in a parallel list so a
+        # period's entries can be sliced out by binary search.
         self._entries: list[BudgetEntry] = []
+        self._entry_dates: list[date] = []
+        # Per-day spend per SPORT. These outlive the raw entries dropped by
+        # nightly_rollup() and seed the buckets of newly added budget periods.
+        self._daily_sport_totals: dict[tuple[date, str], float] = {}
+        # Spend totals bucketed by (period, period_start[, SPORT]), maintained
+        # on write so spent_in_period() is a dict lookup instead of a scan.
+        self._totals: dict[tuple[BudgetPeriod, date, str], float] = {}
+        self._totals_all: dict[tuple[BudgetPeriod, date], float] = {}
+        # summary() results keyed by (reference, entries_version,
+        # budgets_version); any write bumps a version, so stale rows are
+        # never hit and simply age out of the LRU.
+        self._entries_version = 0
+        self._budgets_version = 0
+        self._summary_cache: OrderedDict[tuple[date, int, int], dict[str, Any]] = OrderedDict()
         self._db = db_conn
 
         # Restore entries from database if available
@@ -134,7 +199,31 @@ class BudgetManager:
                 sportsbook=row["sportsbook"],
                 timestamp=datetime.fromisoformat(row["timestamp"]),
             )
+            self._insert_entry(entry)
+
+    def _insert_entry(self, entry: BudgetEntry) -> None:
+        """Insert *entry* keeping ``_entries`` ordered by date, and add it to the daily totals."""
+        entry_date = entry.timestamp.date()
+        amount = entry.amount
+        day_key = (entry_date, entry.sport_upper)
+        self._daily_sport_totals[day_key] = self._daily_sport_totals.get(day_key, 0.0) + amount
+        dates = self._entry_dates
+        if not dates or dates[-1] <= entry_date:
+            # Common case: entries arrive in time order.
+            dates.append(entry_date)
             self._entries.append(entry)
+        else:
+            i = bisect.bisect_right(dates, entry_date)
+            dates.insert(i, entry_date)
+            self._entries.insert(i, entry)
+
+    def _add_to_buckets(self, period: BudgetPeriod, day: date, sport_upper: str, amount: float) -> None:
+        """Add *amount* spent on *day* to *period*'s spend buckets."""
+        start = _period_start(period, day)
+        key = (period, start)
+        self._totals_all[key] = self._totals_all.get(key, 0.0) + amount
+        sport_key = (period, start, sport_upper)
+        self._totals[sport_key] = self._totals.get(sport_key, 0.0) + amount
 
     def _persist_entry(self, entry: BudgetEntry) -> None:
         """Write a single budget entry to SQLite."""
@@ -172,13 +261,26 @@ class BudgetManager:
             limit=limit,
             sport_limits=sport_limits or {},
         )
-        self._budgets[period] = budget
+        is_new_period = self._budgets[period.slot] is None
+        self._budgets[period.slot] = budget
+        self._budgets_version += 1
+        if is_new_period:
+            # Buckets depend only on the period type, so replacing an existing
+            # budget keeps them; a newly tracked period is backfilled from the
+            # daily totals.
+            for (day, sport_upper), amount in self._daily_sport_totals.items():
+                self._add_to_buckets(period, day, sport_upper, amount)
         logger.info("Budget set: %s limit=%.2f sport_limits=%s", period.value, limit, budget.sport_limits)
         return budget
 
+    @property
+    def has_budgets(self) -> bool:
+        """True if at least one budget period is configured."""
+        return any(budget is not None for budget in self._budgets)
+
     def get_budget(self, period: BudgetPeriod) -> Budget | None:
         """Return the budget for a period, or None if not set."""
-        return self._budgets.get(period)
+        return self._budgets[period.slot]
 
     # ------------------------------------------------------------------
     # Spend tracking
@@ -215,17 +317,56 @@ class BudgetManager:
             amount=amount,
             sport=sport,
             sportsbook=sportsbook,
+            timestamp=timestamp if timestamp is not None else _utcnow(),
         )
-        if timestamp is not None:
-            entry.timestamp = timestamp
-        self._entries.append(entry)
-        self._persist_entry(entry)
-        logger.info(
-            "Budget spend recorded: bet_id=%s amount=%.2f sport=%s sportsbook=%s",
-            bet_id, amount, sport, sportsbook,
-        )
+        self._record(entry)
         return entry
 
+    def record_spends(
+        self,
+        bets: Iterable[tuple[str, float, str, str]],
+        timestamp: datetime | None = None,
+    ) -> list[BudgetEntry]:
+        """
+        Record several stakes at once, all sharing one timestamp.
+
+        Parameters
+        ----------
+        bets:
+            ``(bet_id, amount, sport, sportsbook)`` tuples.
+        timestamp:
+            Timestamp for every entry (defaults to now, read once).
+
+        All amounts are validated before anything is recorded.
+        """
+        bets = list(bets)
+        for bet_id, amount, _sport, _sportsbook in bets:
+            if amount <= 0:
+                raise ValueError(f"Spend amount must be positive, got {amount} (bet_id={bet_id})")
+        now = timestamp if timestamp is not None else _utcnow()
+        entries = [
+            BudgetEntry(bet_id=bet_id, amount=amount, sport=sport, sportsbook=sportsbook, timestamp=now)
+            for bet_id, amount, sport, sportsbook in bets
+        ]
+        for entry in entries:
+            self._record(entry)
+        return entries
+
+    def _record(self, entry: BudgetEntry) -> None:
+        """Index, persist and log a new entry."""
+        self._insert_entry(entry)
+        entry_date = entry.timestamp.date()
+        for budget in self._budgets:
+            if budget is not None:
+                self._add_to_buckets(budget.period, entry_date, entry.sport_upper, entry.amount)
+        self._entries_version += 1
+        self._persist_entry(entry)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Budget spend recorded: bet_id=%s amount=%.2f sport=%s sportsbook=%s",
+                entry.bet_id, entry.amount, entry.sport, entry.sportsbook,
+            )
+
     def spent_in_period(
         self,
         period: BudgetPeriod,
@@ -233,7 +374,7 @@ class BudgetManager:
         reference: date | None = None,
     ) -> float:
         """
-        Return total amount spent within the current period.
+        Return total amount spent within the current period, unrounded.
 
         Parameters
         ----------
@@ -244,21 +385,46 @@ class BudgetManager:
         reference:
             Date to use as "today" (defaults to today).
         """
-        budget = self._budgets.get(period)
+        budget = self._budgets[period.slot]
         if budget is None:
             return 0.0
 
-        ref = reference or date.today()
+        ref = reference if reference is not None else date.today()
         start = budget.period_start(ref)
-        end = budget.period_end(ref)
+        if sport is None:
+            total = self._totals_all.get((period, start), 0.0)
+        else:
+            total = self._totals.get((period, start, sport.upper()), 0.0)
+        return total
 
-        total = 0.0
-        for entry in self._entries:
-            entry_date = entry.timestamp.date()
-            if start <= entry_date <= end:
-                if sport is None or entry.sport.upper() == sport.upper():
-                    total += entry.amount
-        return round(total, 2)
+    def entries_in_period(
+        self,
+        period: BudgetPeriod,
+        sport: str | None = None,
+        reference: date | None = None,
+    ) -> list[BudgetEntry]:
+        """
+        Return the entries recorded within the current period.
+
+        Works whether or not a budget is registered for *period*.
+
+        Parameters
+        ----------
+        period:
+            Which budget period to query.
+        sport:
+            If provided, only return entries for this sport.
+        reference:
+            Date to use as "today" (defaults to today).
+        """
+        ref = reference if reference is not None else date.today()
+        lo = bisect.bisect_left(self._entry_dates, _period_start(period, ref))
+        hi = bisect.bisect_right(self._entry_dates, _period_end(period, ref), lo)
+        entries = self._entries[lo:hi]
+        if sport is not None:
+            sport_upper = sport.upper()
+            entries = [e for e in entries if e.sport_upper == sport_upper]
+        return entries
 
     def remaining(
         self,
@@ -266,19 +432,40 @@ class BudgetManager:
         sport: str | None = None,
         reference: date | None = None,
     ) -> float:
-        """Return remaining budget for a period (floor of 0)."""
-        budget = self._budgets.get(period)
+        """Return remaining budget for a period (floor of 0), unrounded."""
+        budget = self._budgets[period.slot]
         if budget is None:
             return float("inf")
 
-        if sport and sport.upper() in {k.upper() for k in budget.sport_limits}:
-            sport_key = next(k for k in budget.sport_limits if k.upper() == sport.upper())
-            limit = budget.sport_limits[sport_key]
-        else:
-            limit = budget.limit
+        limit = budget.limit
+        if sport:
+            limit = budget.sport_limits_upper.get(sport.upper(), limit)
 
-        spent = self.spent_in_period(period, sport=sport, reference=reference)
-        return round(max(0.0, limit - spent), 2)
+        ref = reference if reference is not None else date.today()
+        spent = self.spent_in_period(period, sport=sport, reference=ref)
+        return max(0.0, limit - spent)
+
+    def nightly_rollup(self, reference: date | None = None) -> int:
+        """
+        Drop in-memory entries older than every current budget window.
+
+        Spend totals are untouched: the daily and per-period buckets already
+        hold those amounts, and the entries remain in SQLite. Only
+        entries_in_period() for past periods sees fewer rows afterwards.
+
+        Returns
+        -------
+        Number of entries dropped.
+        """
+        ref = reference if reference is not None else date.today()
+        # A week can start in the previous month, so take the earliest start.
+        cutoff = min(_period_start(period, ref) for period in BudgetPeriod)
+        dropped = bisect.bisect_left(self._entry_dates, cutoff)
+        if dropped:
+            del self._entries[:dropped]
+            del self._entry_dates[:dropped]
+            logger.info("Budget rollup: dropped %d entries before %s", dropped, cutoff.isoformat())
+        return dropped
 
     # ------------------------------------------------------------------
     # Gating
@@ -296,16 +483,18 @@ class BudgetManager:
         Checks all registered budget periods. If no budgets are set, always
         returns True (unbudgeted).
         """
-        if not self._budgets:
+        if not self.has_budgets:
             return True
-        for period in self._budgets:
-            if self.remaining(period, sport=sport, reference=reference) < amount:
+        ref = reference if reference is not None else date.today()
+        for budget in self._budgets:
+            if budget is None:
+                continue
+            period = budget.period
+            rem = self.remaining(period, sport=sport, reference=ref)
+            if rem < amount:
                 logger.warning(
                     "Budget breach: %s remaining=%.2f requested=%.2f sport=%s",
-                    period.value,
-                    self.remaining(period, sport=sport, reference=reference),
-                    amount,
-                    sport,
+                    period.value, rem, amount, sport,
                 )
                 return False
         return True
@@ -315,18 +504,41 @@ class BudgetManager:
     # ------------------------------------------------------------------
 
     def summary(self, reference: date | None = None) -> dict[str, Any]:
-        """Return a summary dict of all budgets for the current period."""
-        ref = reference or date.today()
+        """
+        Return a summary dict of all budgets for the current period.
+
+        Results are cached until the next add_budget() or record_spend();
+        each call gets its own copy of the per-period rows.
+        """
+        ref = reference if reference is not None else date.today()
+        key = (ref, self._entries_version, self._budgets_version)
+        cached = self._summary_cache.get(key)
+        if cached is None:
+            cached = self._build_summary(ref)
+            self._summary_cache[key] = cached
+            if len(self._summary_cache) > _SUMMARY_CACHE_SIZE:
+                self._summary_cache.popitem(last=False)
+        else:
+            self._summary_cache.move_to_end(key)
+        return {
+            name: {**row, "sport_limits": dict(row["sport_limits"])}
+            for name, row in cached.items()
+        }
+
+    def _build_summary(self, ref: date) -> dict[str, Any]:
         result: dict[str, Any] = {}
-        for period, budget in self._budgets.items():
+        for budget in self._budgets:
+            if budget is None:
+                continue
+            period = budget.period
             spent = self.spent_in_period(period, reference=ref)
             result[period.value] = {
                 "limit": budget.limit,
-                "spent": spent,
+                "spent": round(spent, 2),
                 "remaining": round(max(0.0, budget.limit - spent), 2),
                 "utilisation_pct": round(spent / budget.limit * 100, 1) if budget.limit > 0 else 0.0,
                 "period_start": budget.period_start(ref).isoformat(),
                 "period_end": budget.period_end(ref).isoformat(),
-                "sport_limits": budget.sport_limits,
+                "sport_limits": dict(budget.sport_limits),
             }
         return result
@@ -9,8 +9,11 @@ Adjusts bet edge/confidence based on game-time circadian effects:
 """
 
 import logging
+import sys
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, time as dt_time
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +22,8 @@ logger = logging.getLogger(__name__)
 # -----------------------------------------------------------------------
 
 # Local hour ranges considered "optimal" and "suboptimal" for athletes
-_OPTIMAL_HOUR_RANGE = range(14, 21)     # hours 14–20 inclusive (2 PM–8 PM local)
+_OPTIMAL_HOUR_START = 14               # 2 PM local
+_OPTIMAL_HOUR_END = 20                  # 8 PM local (inclusive)
 _LATE_NIGHT_HOUR = 21                   # 21:00+ → fatigue penalty applies
 
 # Penalty / bonus magnitudes (multiplicative on edge estimate)
@@ -29,10 +33,82 @@ _TIMEZONE_SHIFT_PENALTY = 0.04 # 4 % per hour of eastward cross-country shift
 _OPTIMAL_BONUS = 0.02          # 2 % edge bonus for games in optimal window
 
 # Sports known to have significant circadian sensitivity
-_CIRCADIAN_SENSITIVE_SPORTS = {"NBA", "NHL", "NFL", "NCAAMB"}
+_CIRCADIAN_SENSITIVE_SPORTS = frozenset({"NBA", "NHL", "NFL", "NCAAMB"})
 
 
-@dataclass
+def _is_sensitive(sport: str) -> bool:
+    # Callers almost always pass the canonical upper-case name; only
+    # case-fold on a miss.
+    return sport in _CIRCADIAN_SENSITIVE_SPORTS or sport.upper() in _CIRCADIAN_SENSITIVE_SPORTS
+
+
+@lru_cache(maxsize=4096)
+def _factor(
+    params: tuple[float, float, float, float],
+    home_hour: int,
+    shift: float,
+    away_b2b: bool,
+    home_b2b: bool,
+) -> float:
+    """
+    Combined circadian factor for one game slot.
+
+    Each rule contributes ``condition * magnitude`` to a single accumulator,
+    so there is no branching and nothing is allocated.
+    """
+    late_night_penalty, b2b_penalty, tz_penalty, optimal_bonus = params
+    late = home_hour >= _LATE_NIGHT_HOUR
+
+    factor = 0.0
+    factor -= late * late_night_penalty
+    factor += (not late and _OPTIMAL_HOUR_START <= home_hour <= _OPTIMAL_HOUR_END) * optimal_bonus
+    factor -= away_b2b * b2b_penalty
+    factor -= home_b2b * (b2b_penalty / 2)
+    factor -= (shift > 1.5) * min(shift * tz_penalty, 0.20)
+    factor += (shift < -1.5) * min(-shift * tz_penalty / 2, 0.05)
+    return round(factor, 4)
+
+
+@lru_cache(maxsize=4096)
+def _reasons(
+    params: tuple[float, float, float, float],
+    home_hour: int,
+    shift: float,
+    away_b2b: bool,
+    home_b2b: bool,
+) -> tuple[str, ...]:
+    """Human-readable reasons behind :func:`_factor` for one game slot."""
+    late_night_penalty, b2b_penalty, tz_penalty, optimal_bonus = params
+    reasons: list[str] = []
+
+    # 1. Late-night game penalty (affects both teams, especially visitors)
+    if home_hour >= _LATE_NIGHT_HOUR:
+        reasons.append(f"Late-night game (local hour {home_hour}) → -{late_night_penalty:.0%}")
+
+    # 2. Optimal performance window bonus
+    elif _OPTIMAL_HOUR_START <= home_hour <= _OPTIMAL_HOUR_END:
+        reasons.append(f"Optimal tip-off hour ({home_hour}:00) → +{optimal_bonus:.0%}")
+
+    # 3. Away team back-to-back penalty
+    if away_b2b:
+        reasons.append(f"Away team B2B → -{b2b_penalty:.0%}")
+
+    # 4. Home team back-to-back (lesser penalty — home court advantage partially offsets)
+    if home_b2b:
+        reasons.append(f"Home team B2B → -{b2b_penalty / 2:.0%}")
+
+    # 5. Cross-country timezone shift for away team (eastward travel hurts more)
+    if shift > 1.5:   # more than 1.5 hours eastward
+        penalty = min(shift * tz_penalty, 0.20)  # cap at 20%
+        reasons.append(f"Away team eastward travel shift {shift:.1f}h → -{penalty:.0%}")
+    elif shift < -1.5:  # westward travel is less disruptive — slight bonus
+        bonus = min(abs(shift) * tz_penalty / 2, 0.05)
+        reasons.append(f"Away team westward travel {abs(shift):.1f}h → +{bonus:.0%}")
+
+    return tuple(reasons)
+
+
+@dataclass(slots=True)
 class GameContext:
     """
     Contextual information about a game used for circadian adjustment.
@@ -60,6 +136,11 @@ class GameContext:
     away_team_back_to_back: bool = False
     home_team_back_to_back: bool = False
 
+    def __post_init__(self) -> None:
+        # Sports are a tiny fixed vocabulary; interning makes the set probes
+        # in CircadianFactoring hit on identity.
+        self.sport = sys.intern(self.sport)
+
     def home_local_hour(self) -> int:
         """Return the game's local start hour at the home venue."""
         utc_hour = self.game_time_utc.hour + self.game_time_utc.minute / 60
@@ -73,7 +154,7 @@ class GameContext:
         return self.home_team_timezone_offset - self.away_team_timezone_offset
 
 
-@dataclass
+@dataclass(slots=True)
 class CircadianAdjustment:
     """
     Multiplicative edge adjustment derived from circadian analysis.
@@ -123,55 +204,65 @@ class CircadianFactoring:
         Compute the combined circadian factor for a game.
 
         Returns a :class:`CircadianAdjustment` with a ``factor`` in the
-        range ``(-1, +1)`` and human-readable ``reasons``.
+        range ``(-1, +1)`` and human-readable ``reasons``. Callers that only
+        need the number should use :meth:`compute_factor`.
         """
-        factor = 0.0
-        reasons: list[str] = []
-
-        if ctx.sport.upper() not in _CIRCADIAN_SENSITIVE_SPORTS:
-            logger.debug("Sport %s not circadian-sensitive — no adjustment.", ctx.sport)
+        if not _is_sensitive(ctx.sport):
             return CircadianAdjustment(factor=0.0, reasons=["Sport not circadian-sensitive"])
 
-        home_hour = ctx.home_local_hour()
-
-        # 1. Late-night game penalty (affects both teams, especially visitors)
-        if home_hour >= _LATE_NIGHT_HOUR:
-            factor -= self.late_night_penalty
-            reasons.append(f"Late-night game (local hour {home_hour}) → -{self.late_night_penalty:.0%}")
-
-        # 2. Optimal performance window bonus
-        elif home_hour in _OPTIMAL_HOUR_RANGE:
-            factor += self.optimal_bonus
-            reasons.append(f"Optimal tip-off hour ({home_hour}:00) → +{self.optimal_bonus:.0%}")
-
-        # 3. Away team back-to-back penalty
-        if ctx.away_team_back_to_back:
-            factor -= self.back_to_back_penalty
-            reasons.append(f"Away team B2B → -{self.back_to_back_penalty:.0%}")
-
-        # 4. Home team back-to-back (lesser penalty — home court advantage partially offsets)
-        if ctx.home_team_back_to_back:
-            half_penalty = self.back_to_back_penalty / 2
-            factor -= half_penalty
-            reasons.append(f"Home team B2B → -{half_penalty:.0%}")
-
-        # 5. Cross-country timezone shift for away team (eastward travel hurts more)
-        shift = ctx.away_travel_shift()
-        if shift > 1.5:   # more than 1.5 hours eastward
-            penalty = min(shift * self.timezone_shift_penalty, 0.20)  # cap at 20%
-            factor -= penalty
-            reasons.append(
-                f"Away team eastward travel shift {shift:.1f}h → -{penalty:.0%}"
-            )
-        elif shift < -1.5:  # westward travel is less disruptive — slight bonus
-            bonus = min(abs(shift) * self.timezone_shift_penalty / 2, 0.05)
-            factor += bonus
-            reasons.append(
-                f"Away team westward travel {abs(shift):.1f}h → +{bonus:.0%}"
-            )
-
+        # Local hour and travel shift are derived once and shared by the
+        # factor and its reasons.
+        slot = self._slot(ctx)
+        factor = _factor(*slot)
+        reasons = list(_reasons(*slot))
         logger.debug(
-            "CircadianFactoring: sport=%s hour=%d shift=%.1f factor=%.4f reasons=%s",
-            ctx.sport, home_hour, shift, factor, reasons,
+            "CircadianFactoring: sport=%s factor=%.4f reasons=%s",
+            ctx.sport, factor, reasons,
         )
-        return CircadianAdjustment(factor=round(factor, 4), reasons=reasons)
+        return CircadianAdjustment(factor=factor, reasons=reasons)
+
+    def compute_factor(self, ctx: GameContext) -> float:
+        """
+        Return just the circadian factor for a game (rounded to 4 places).
+
+        Factors are memoized on the handful of inputs they depend on (local
+        hour, travel shift, back-to-back flags and the penalty settings), so
+        legs sharing a slot cost one cache probe.
+        """
+        if not _is_sensitive(ctx.sport):
+            return 0.0
+        return _factor(*self._slot(ctx))
+
+    def explain(self, ctx: GameContext) -> list[str]:
+        """Return the human-readable reasons behind :meth:`compute_factor`."""
+        if not _is_sensitive(ctx.sport):
+            return ["Sport not circadian-sensitive"]
+        return list(_reasons(*self._slot(ctx)))
+
+    def _slot(self, ctx: GameContext) -> tuple[tuple[float, float, float, float], int, float, bool, bool]:
+        """
+        Return the memoization key for *ctx*: penalty settings, home local
+        hour, away travel shift and the two back-to-back flags.
+        """
+        return (
+            (
+                self.late_night_penalty,
+                self.back_to_back_penalty,
+                self.timezone_shift_penalty,
+                self.optimal_bonus,
+            ),
+            ctx.home_local_hour(),
+            ctx.away_travel_shift(),
+            ctx.away_team_back_to_back,
+            ctx.home_team_back_to_back,
+        )
+
+    def compute_batch(self, ctxs: Iterable[GameContext]) -> list[float]:
+        """
+        Return the circadian factor for each context, in order.
+
+        Same factors as :meth:`compute` but without building the ``reasons``
+        strings or adjustment objects, for scoring many legs at once.
+        """
+        compute_factor = self.compute_factor
+        return [compute_factor(ctx) for ctx in ctxs]
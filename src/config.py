@@ -29,19 +29,23 @@ def _default_cors_origins() -> list[str]:
     return []
 
 
-@dataclass
+# List-valued settings are parsed once at import; each Settings instance gets
+# its own list copy so callers can't mutate the shared defaults.
+_ACTIVE_SPORTS: tuple[str, ...] = tuple(_parse_csv_env("ACTIVE_SPORTS", "NFL,NBA,NHL,MLB"))
+_CORS_ORIGINS: tuple[str, ...] = tuple(_default_cors_origins())
+
+
+@dataclass(slots=True)
 class Settings:
     """Central configuration for Sports-Steve."""
 
     ENV: str = os.getenv("ENV", "development").lower()
 
     # Sports to monitor for daily bet assessment
-    ACTIVE_SPORTS: list[str] = field(
-        default_factory=lambda: _parse_csv_env("ACTIVE_SPORTS", "NFL,NBA,NHL,MLB")
-    )
+    ACTIVE_SPORTS: list[str] = field(default_factory=lambda: list(_ACTIVE_SPORTS))
 
     # Allowed browser origins for the API
-    CORS_ORIGINS: list[str] = field(default_factory=_default_cors_origins)
+    CORS_ORIGINS: list[str] = field(default_factory=lambda: list(_CORS_ORIGINS))
 
     # Maximum daily stake budget (USD)
     MAX_DAILY_STAKE: float = float(os.getenv("MAX_DAILY_STAKE", "100.0"))
@@ -83,6 +87,12 @@ class Settings:
     RISK_MAX_EXPOSURE_PCT: float = float(os.getenv("RISK_MAX_EXPOSURE_PCT", "0.20"))
     RISK_KELLY_FRACTION: float = float(os.getenv("RISK_KELLY_FRACTION", "0.25"))
 
+    # Timezone the scheduler's cron jobs fire in
+    SCHEDULER_TZ: str = os.getenv("SCHEDULER_TZ", "UTC")
+
+    # Max simultaneous in-flight requests to any one broker, across all jobs
+    BROKER_MAX_INFLIGHT: int = int(os.getenv("BROKER_MAX_INFLIGHT", "4"))
+
     # Circadian factoring
     CIRCADIAN_ENABLED: bool = os.getenv("CIRCADIAN_ENABLED", "true").lower() == "true"
 
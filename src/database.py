@@ -182,7 +182,7 @@ def save_transaction(conn: sqlite3.Connection, txn) -> None:
         """INSERT OR REPLACE INTO account_transactions
            (id, account_id, txn_type, amount, description, timestamp)
            VALUES (?, ?, ?, ?, ?, ?)""",
-        (txn.id, txn.account_id, txn.txn_type, txn.amount, txn.description, txn.timestamp.isoformat()),
+        (txn.id, txn.account_id, txn.txn_type, txn.amount, txn.description, txn.timestamp_dt.isoformat()),
     )
     conn.commit()
 
@@ -4,6 +4,7 @@ src/main.py  -- FastAPI app with scheduler wired into lifespan.
 
 import asyncio
 import logging
+import operator
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import Optional
@@ -19,7 +20,7 @@ from fastapi_cache.decorator import cache
 from src.config import settings
 from src.database import get_connection, init_db
 from src.risk_manager import RiskManager
-from src.scheduler import create_scheduler
+from src.scheduler import _build_brokers, create_scheduler, daily_bet_assessment, resolve_bets
 from src.account_tracker import AccountTracker
 from src.budget import BudgetManager, BudgetPeriod
 
@@ -94,8 +95,6 @@ async def lifespan(app: FastAPI):
         budget_manager.add_budget(BudgetPeriod.MONTHLY, settings.BUDGET_MONTHLY_LIMIT)
     app.state.budget_manager = budget_manager
 
-    from src.scheduler import _build_brokers
-
     app.state.brokers = _build_brokers()
 
     scheduler = create_scheduler(app)
@@ -198,7 +197,6 @@ async def backtest_run(req: BacktestRequest):
 async def trigger_daily_run(background_tasks: BackgroundTasks):
     if _daily_run_lock.locked():
         raise HTTPException(status_code=409, detail="Daily run already in progress")
-    from src.scheduler import daily_bet_assessment
 
     async def _locked_daily_run(app_ref):
         async with _daily_run_lock:
@@ -210,8 +208,6 @@ async def trigger_daily_run(background_tasks: BackgroundTasks):
 
 @router.post("/resolve-bets", summary="Manually trigger bet resolution")
 async def trigger_resolve_bets(background_tasks: BackgroundTasks):
-    from src.scheduler import resolve_bets
-
     background_tasks.add_task(resolve_bets, app)
     return {"status": "queued", "job": "resolve_bets"}
 
@@ -281,7 +277,7 @@ async def get_bets():
                 "placed_at": b.placed_at.isoformat(),
                 "settled_at": b.settled_at.isoformat() if b.settled_at else None,
             }
-            for b in sorted(bets, key=lambda x: x.placed_at, reverse=True)
+            for b in sorted(bets, key=operator.attrgetter("placed_at"), reverse=True)
         ],
         "count": len(bets),
     }
@@ -316,10 +312,11 @@ async def get_exposure():
 @router.get("/accounts", summary="Sportsbook account summary")
 async def get_accounts():
     tracker = app.state.account_tracker
+    accounts, health_flags = tracker.full_report()
     return {
-        "accounts": tracker.account_summary(),
-        "total_balance": tracker.total_balance(),
-        "health_flags": tracker.health_report(),
+        "accounts": accounts,
+        "total_balance": round(tracker.total_balance(), 2),
+        "health_flags": health_flags,
     }
 
 
@@ -328,7 +325,7 @@ async def get_budget():
     bm = app.state.budget_manager
     return {
         "budgets": bm.summary(),
-        "has_budgets": len(bm._budgets) > 0,
+        "has_budgets": bm.has_budgets,
     }
 
 
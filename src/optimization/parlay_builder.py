@@ -9,21 +9,75 @@ Implements:
     real legs from live broker odds feeds via _fetch_legs()
 """
 
+import asyncio
+import heapq
 import itertools
 import logging
+import math
 import uuid
-from dataclasses import dataclass, field
+from functools import lru_cache
+from dataclasses import asdict, dataclass, field, is_dataclass
 from datetime import datetime, timezone
 from typing import Any
 
+from src.brokers.base import broker_slot
+
 logger = logging.getLogger(__name__)
 
+# Default cap on a single parlay's stake, as a fraction of bankroll.
+_DEFAULT_MAX_EXPOSURE_PCT = 0.20
+
+# Fractional-Kelly multiplier per optimizer risk profile.
+_KELLY_BY_PROFILE: dict[str, float] = {"aggressive": 0.50, "balanced": 0.25, "conservative": 0.10}
+
+# Tolerance on the optimizer's EV upper bound: EVs are compared to min_edge
+# after rounding to 4 places, so a bound this close to it is not pruned.
+_PRUNE_SLACK = 1e-4
+
+# Candidate-leg count from which the combo sweep is moved off the event loop;
+# below it the sweep is quicker than a thread hand-off.
+_OFFLOAD_MIN_LEGS = 40
+
+
+@lru_cache(maxsize=8)
+def _normalize_sports(sports: tuple[str, ...]) -> frozenset[str]:
+    """Upper-cased set of *sports*; the scheduler passes the same list daily."""
+    return frozenset(s.upper() for s in sports)
+
+
+def _validate_leg(leg: "Leg") -> None:
+    """
+    Raise ValueError if *leg* cannot be scored.
+
+    Checks the inputs the optimizer's combo sweep reads: finite numeric odds
+    and win probability, and (when the leg has a game time) a context the
+    circadian factoring can evaluate.
+    """
+    for name in ("odds", "win_probability"):
+        value = getattr(leg, name)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"{name} must be a finite number, got {value!r}")
+    if leg.game_time_utc is not None:
+        from src.circadian import GameContext
+        try:
+            ctx = GameContext(
+                game_time_utc=leg.game_time_utc,
+                home_team_timezone_offset=leg.home_tz_offset,
+                away_team_timezone_offset=leg.away_tz_offset,
+                sport=leg.sport,
+            )
+            ctx.home_local_hour()
+            ctx.away_travel_shift()
+        except (AttributeError, TypeError) as exc:
+            raise ValueError(f"unusable game time or timezone offsets ({exc})") from exc
+
+
 # ---------------------------------------------------------------------------
 # Data classes
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Leg:
     """A single leg of a parlay."""
     event_id: str
@@ -44,7 +98,7 @@ class Leg:
     projection_id: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Parlay:
     """A candidate parlay to be placed."""
     id: str
@@ -54,6 +108,28 @@ class Parlay:
     recommended_stake: float = 0.0
     expected_value: float = 0.0
     win_probability: float = 0.0
+    _leg_payloads: list[dict] | None = field(default=None, init=False, repr=False, compare=False)
+
+    def leg_payloads(self) -> list[dict]:
+        """
+        Return the legs as plain dicts, as sent to brokers and the audit trail.
+
+        Computed once per parlay (legs are frozen); treat the dicts as
+        read-only.
+        """
+        payloads = self._leg_payloads
+        if payloads is None:
+            payloads = self._leg_payloads = [_leg_payload(leg) for leg in self.legs]
+        return payloads
+
+
+def _leg_payload(leg: object) -> dict:
+    """Convert a parlay leg into a JSON-serializable mapping."""
+    if is_dataclass(leg):
+        return asdict(leg)
+    if isinstance(leg, dict):
+        return dict(leg)
+    return dict(vars(leg))
 
 
 # ---------------------------------------------------------------------------
@@ -87,7 +163,7 @@ class ParlayBuilder:
         sport: str,
         bankroll: float = 100.0,
         kelly_fraction: float = 0.25,
-        max_exposure_pct: float = 0.20,
+        max_exposure_pct: float = _DEFAULT_MAX_EXPOSURE_PCT,
     ) -> Parlay:
         """
         Build a Parlay from a list of legs.
@@ -111,36 +187,41 @@ class ParlayBuilder:
         """
         if not legs:
             raise ValueError("Cannot build a parlay with no legs.")
+        scored = self._score(legs, sport, bankroll, kelly_fraction, max_exposure_pct)
+        return self._make_parlay(legs, sport, scored)
 
-        combined_odds = 1.0
-        combined_win_prob = 1.0
-        for leg in legs:
-            combined_odds *= leg.odds
-            if leg.win_probability > 0:
-                combined_win_prob *= leg.win_probability
+    def _score(
+        self,
+        legs: list[Leg],
+        sport: str,
+        bankroll: float,
+        kelly_fraction: float,
+        max_exposure_pct: float,
+    ) -> tuple[float, float, float, float]:
+        """
+        Return unrounded ``(odds, win_probability, ev, stake)`` for *legs*.
+
+        Does the arithmetic of :meth:`build` without allocating a Parlay or
+        an id, so callers can rank many combinations cheaply.
+        """
+        if len(legs) == 1:
+            # Singles are the common case; skip the two generator reductions.
+            leg = legs[0]
+            combined_odds = leg.odds
+            combined_win_prob = leg.win_probability if leg.win_probability > 0 else 1.0
+        else:
+            combined_odds = math.prod(leg.odds for leg in legs)
+            combined_win_prob = math.prod(leg.win_probability for leg in legs if leg.win_probability > 0)
 
         # Expected value (per unit stake)
         ev = combined_win_prob * (combined_odds - 1.0) - (1.0 - combined_win_prob)
 
         # Apply circadian adjustment to EV if enabled and game_time data available
         if self._circadian is not None:
-            from src.circadian import GameContext
-            for leg in legs:
-                if leg.game_time_utc is not None:
-                    ctx = GameContext(
-                        game_time_utc=leg.game_time_utc,
-                        home_team_timezone_offset=leg.home_tz_offset,
-                        away_team_timezone_offset=leg.away_tz_offset,
-                        sport=sport,
-                        away_team_back_to_back=leg.away_back_to_back,
-                        home_team_back_to_back=leg.home_back_to_back,
-                    )
-                    adj = self._circadian.compute(ctx)
-                    ev = adj.apply(ev)
-                    logger.debug(
-                        "Circadian adjustment for leg %s: factor=%.4f reasons=%s",
-                        leg.event_id, adj.factor, adj.reasons,
-                    )
+            for leg, factor in zip(legs, self.circadian_factors(legs, sport)):
+                if factor is not None:
+                    ev = max(0.0, ev * (1.0 + factor))
+                    logger.debug("Circadian adjustment for leg %s: factor=%.4f", leg.event_id, factor)
 
         # Kelly stake sizing
         b = combined_odds - 1.0
@@ -153,6 +234,41 @@ class ParlayBuilder:
         else:
             stake = 0.0
 
+        return combined_odds, combined_win_prob, ev, stake
+
+    def circadian_factors(self, legs: list[Leg], sport: str) -> list[float | None]:
+        """
+        Return each leg's circadian factor for a parlay in *sport*.
+
+        ``None`` marks legs without a game time (no adjustment); all entries
+        are ``None`` when circadian factoring is disabled.
+        """
+        if self._circadian is None:
+            return [None] * len(legs)
+        from src.circadian import GameContext
+        timed = [i for i, leg in enumerate(legs) if leg.game_time_utc is not None]
+        factors: list[float | None] = [None] * len(legs)
+        computed = self._circadian.compute_batch(
+            GameContext(
+                game_time_utc=legs[i].game_time_utc,
+                home_team_timezone_offset=legs[i].home_tz_offset,
+                away_team_timezone_offset=legs[i].away_tz_offset,
+                sport=sport,
+                away_team_back_to_back=legs[i].away_back_to_back,
+                home_team_back_to_back=legs[i].home_back_to_back,
+            )
+            for i in timed
+        )
+        for i, factor in zip(timed, computed):
+            factors[i] = factor
+        return factors
+
+    @staticmethod
+    def _make_parlay(
+        legs: list[Leg], sport: str, scored: tuple[float, float, float, float]
+    ) -> Parlay:
+        """Wrap a :meth:`_score` result in a Parlay with a fresh id."""
+        combined_odds, combined_win_prob, ev, stake = scored
         return Parlay(
             id=str(uuid.uuid4()),
             sport=sport,
@@ -187,6 +303,10 @@ class ParlayOptimizer:
     # PrizePicks decimal odds for "more" / "less" picks (no odds field in API)
     PRIZEPICKS_DEFAULT_DECIMAL_ODDS = 1.8182  # approximately -120 American
 
+    # Sports sourced from DraftKings game lines vs. PrizePicks player props
+    _GAME_LINE_SPORTS = frozenset({"NFL", "MLB", "NHL", "NCAAFB", "NCAAMB"})
+    _PROP_SPORTS = frozenset({"NBA", "WNBA", "MMA", "GOLF", "SOCCER", "ESPORTS"})
+
     def __init__(
         self,
         risk_profile: str = "balanced",
@@ -196,7 +316,7 @@ class ParlayOptimizer:
         **kwargs: Any,
     ):
         self.risk_profile = risk_profile
-        self._candidate_legs: list[Leg] = candidate_legs or []
+        self.candidate_legs = candidate_legs or []
         self._builder = ParlayBuilder(use_circadian=use_circadian)
         self._brokers = brokers or {}
         logger.info(
@@ -206,15 +326,28 @@ class ParlayOptimizer:
             list(self._brokers.keys()),
         )
 
+    @property
+    def candidate_legs(self) -> tuple[Leg, ...]:
+        """Static legs supplied for testing/backtesting (read-only snapshot)."""
+        return self._candidate_legs
+
+    @candidate_legs.setter
+    def candidate_legs(self, legs: list[Leg]) -> None:
+        # Copied so later changes to the caller's list can't desync the index.
+        self._candidate_legs: tuple[Leg, ...] = tuple(legs)
+        # Positions of the static legs per upper-cased sport, ascending.
+        by_sport: dict[str, list[int]] = {}
+        for i, leg in enumerate(self._candidate_legs):
+            by_sport.setdefault(leg.sport.upper(), []).append(i)
+        self._legs_by_sport = by_sport
+
     # ------------------------------------------------------------------
     # Kelly fraction by risk profile
     # ------------------------------------------------------------------
 
     @property
     def _kelly_fraction(self) -> float:
-        return {"aggressive": 0.50, "balanced": 0.25, "conservative": 0.10}.get(
-            self.risk_profile, 0.25
-        )
+        return _KELLY_BY_PROFILE.get(self.risk_profile, 0.25)
 
     # ------------------------------------------------------------------
     # Public API
@@ -253,35 +386,148 @@ class ParlayOptimizer:
             sports, min_edge, max_legs,
         )
 
-        legs = await self._fetch_legs(sports)
+        legs = self._usable_legs(await self._fetch_legs(sports))
         if not legs:
             logger.info("No candidate legs available -- returning empty list.")
             return []
 
-        parlays: list[Parlay] = []
-        for n_legs in range(1, max_legs + 1):
-            for combo in itertools.combinations(legs, n_legs):
-                try:
-                    sport = combo[0].sport if hasattr(combo[0], "sport") else sports[0]
-                    parlay = self._builder.build(
-                        legs=list(combo),
-                        sport=sport,
-                        bankroll=bankroll,
-                        kelly_fraction=self._kelly_fraction,
-                    )
-                    if parlay.expected_value >= min_edge and parlay.recommended_stake > 0:
-                        parlays.append(parlay)
-                except Exception:
-                    logger.exception("Failed to build parlay from combo")
-
-        parlays.sort(key=lambda p: p.expected_value, reverse=True)
-        result = parlays[:top_n]
+        if len(legs) >= _OFFLOAD_MIN_LEGS:
+            # Large sweeps run in a worker thread so the event loop (API
+            # requests, other jobs) stays responsive while they score.
+            scored = await asyncio.to_thread(self._score_combos, legs, max_legs, min_edge, bankroll)
+        else:
+            scored = self._score_combos(legs, max_legs, min_edge, bankroll)
+        # Rank on the same rounded EV a Parlay reports; only the winners get
+        # an id and a Parlay object.
+        top = heapq.nlargest(top_n, scored, key=lambda item: round(item[0][2], 4))
+        builder = self._builder
+        result = []
+        for score, idx in top:
+            combo = [legs[i] for i in idx]
+            result.append(builder._make_parlay(combo, combo[0].sport, score))
         logger.info(
             "Optimizer found %d parlay candidates; returning top %d by EV",
-            len(parlays), top_n,
+            len(scored), top_n,
         )
         return result
 
+    @staticmethod
+    def _usable_legs(legs: list[Leg]) -> list[Leg]:
+        """
+        Return *legs* minus any that cannot be scored, logging each one dropped.
+
+        The combo sweep precomputes per-leg odds and circadian factors, so a
+        single malformed leg would otherwise abort the whole run.
+        """
+        usable = []
+        for leg in legs:
+            try:
+                _validate_leg(leg)
+            except ValueError as exc:
+                logger.warning("Dropping malformed leg %s: %s", getattr(leg, "event_id", "?"), exc)
+                continue
+            usable.append(leg)
+        return usable
+
+    def _score_combos(
+        self,
+        legs: list[Leg],
+        max_legs: int,
+        min_edge: float,
+        bankroll: float,
+    ) -> list[tuple[tuple[float, float, float, float], tuple[int, ...]]]:
+        """
+        Score every combination of up to *max_legs* legs.
+
+        Returns ``(score, leg_indices)`` pairs, in enumeration order, for the
+        combos that clear *min_edge* with a positive stake; ``score`` is the
+        :meth:`ParlayBuilder._score` tuple.
+        """
+        kelly_fraction = self._kelly_fraction
+        passing: list[tuple[tuple[float, float, float, float], tuple[int, ...]]] = []
+
+        odds = [leg.odds for leg in legs]
+        probs = [leg.win_probability if leg.win_probability > 0 else 1.0 for leg in legs]
+        max_stake = bankroll * _DEFAULT_MAX_EXPOSURE_PCT
+
+        # A parlay's circadian adjustment uses its first leg's sport, so leg
+        # factors are computed once per leg and sport rather than per combo.
+        use_circadian = self._builder._circadian is not None
+        factors_by_sport: dict[str, list[float | None]] = {}
+
+        def factors_for(sport: str) -> list[float | None]:
+            factors = factors_by_sport.get(sport)
+            if factors is None:
+                factors = factors_by_sport[sport] = self._builder.circadian_factors(legs, sport)
+            return factors
+
+        # A combo's raw EV is p*o - 1 and its circadian multipliers are each at
+        # most max(1, 1 + f), so with a positive min_edge the best any last
+        # leg can do for a prefix is bounded by the largest o*p*max(1, 1 + f)
+        # to its right. Prefixes whose bound misses min_edge skip the inner
+        # loop; the slack keeps combos that only pass after rounding.
+        n = len(legs)
+        prune = min_edge > _PRUNE_SLACK
+        suffix_by_sport: dict[str | None, list[float]] = {}
+
+        def suffix_bounds(sport: str | None) -> list[float]:
+            suffix = suffix_by_sport.get(sport)
+            if suffix is None:
+                factors = factors_for(sport) if sport is not None else [None] * n
+                suffix = [0.0] * (n + 1)
+                for i in range(n - 1, -1, -1):
+                    factor = factors[i]
+                    lift = 1.0 + factor if factor is not None and factor > 0 else 1.0
+                    suffix[i] = max(suffix[i + 1], odds[i] * probs[i] * lift)
+                suffix_by_sport[sport] = suffix
+            return suffix
+
+        # Enumerate in itertools.combinations order, but only the right-most
+        # index moves in the inner loop: the prefix products are computed once
+        # per prefix and each combo costs a single multiply.
+        for n_legs in range(1, max_legs + 1):
+            for prefix in itertools.combinations(range(n - 1), n_legs - 1):
+                prefix_odds = 1.0
+                prefix_win_prob = 1.0
+                for i in prefix:
+                    prefix_odds *= odds[i]
+                    prefix_win_prob *= probs[i]
+                prefix_factors = factors_for(legs[prefix[0]].sport) if use_circadian and prefix else None
+
+                if prune and prefix:
+                    lift = 1.0
+                    if prefix_factors is not None:
+                        for i in prefix:
+                            factor = prefix_factors[i]
+                            if factor is not None and factor > 0:
+                                lift *= 1.0 + factor
+                    best = suffix_bounds(legs[prefix[0]].sport if use_circadian else None)[prefix[-1] + 1]
+                    if (prefix_odds * prefix_win_prob * best - 1.0) * lift < min_edge - _PRUNE_SLACK:
+                        continue
+
+                for j in range(prefix[-1] + 1 if prefix else 0, n):
+                    combined_odds = prefix_odds * odds[j]
+                    combined_win_prob = prefix_win_prob * probs[j]
+
+                    ev = combined_win_prob * (combined_odds - 1.0) - (1.0 - combined_win_prob)
+                    if use_circadian:
+                        factors = prefix_factors or factors_for(legs[j].sport)
+                        for i in (*prefix, j):
+                            factor = factors[i]
+                            if factor is not None:
+                                ev = max(0.0, ev * (1.0 + factor))
+
+                    b = combined_odds - 1.0
+                    if round(ev, 4) < min_edge or not (0 < combined_win_prob < 1 and b > 0):
+                        continue
+                    kelly_full = (b * combined_win_prob - (1.0 - combined_win_prob)) / b
+                    if kelly_full <= 0:
+                        continue
+                    stake = min(kelly_full * kelly_fraction * bankroll, max_stake)
+                    if round(stake, 2) > 0:
+                        passing.append(((combined_odds, combined_win_prob, ev, stake), (*prefix, j)))
+        return passing
+
     async def _fetch_legs(self, sports: list[str]) -> list[Leg]:
         """
         Fetch candidate legs from live broker odds feeds.
@@ -299,52 +545,61 @@ class ParlayOptimizer:
 
         # 1. Static / pre-supplied legs (for testing / backtesting)
         if self._candidate_legs:
-            sports_upper = {s.upper() for s in sports}
-            legs.extend(
-                leg for leg in self._candidate_legs
-                if getattr(leg, "sport", sports[0]).upper() in sports_upper
-            )
-
-        # 2. Live legs from brokers
+            by_sport = self._legs_by_sport
+            runs = [by_sport[s] for s in _normalize_sports(tuple(sports)) if s in by_sport]
+            # Merge the per-sport positions so legs keep their supplied order.
+            candidates = self._candidate_legs
+            legs.extend(candidates[i] for i in heapq.merge(*runs))
+
+        # 2. Live legs from brokers, fetched for all sports concurrently;
+        #    each request holds a slot of its broker's in-flight limit.
         pp_broker = self._brokers.get("prizepicks")
         dk_broker = self._brokers.get("draftkings")
+        if pp_broker is not None or dk_broker is not None:
+            per_sport = await asyncio.gather(
+                *(self._fetch_sport_legs(sport, pp_broker, dk_broker) for sport in sports)
+            )
+            for sport_legs in per_sport:
+                legs.extend(sport_legs)
 
-        game_line_sports = {"NFL", "MLB", "NHL", "NCAAFB", "NCAAMB"}
-        prop_sports = {"NBA", "WNBA", "MMA", "GOLF", "SOCCER", "ESPORTS"}
+        logger.info("Total candidate legs fetched: %d", len(legs))
+        return legs
 
-        for sport in sports:
-            sport_upper = sport.upper()
+    async def _fetch_sport_legs(self, sport: str, pp_broker: Any, dk_broker: Any) -> list[Leg]:
+        """Fetch live legs for one sport from whichever broker covers it."""
+        sport_upper = sport.upper()
+        legs: list[Leg] = []
 
-            # -- PrizePicks props --
-            if pp_broker is not None and (sport_upper in prop_sports or sport_upper == "NBA"):
-                try:
+        # -- PrizePicks props --
+        if pp_broker is not None and sport_upper in self._PROP_SPORTS:
+            try:
+                async with broker_slot(pp_broker):
                     odds_data = await pp_broker.get_odds(sport, [])
-                    for proj_id, proj in odds_data.items():
-                        leg = self._prizepicks_projection_to_leg(proj_id, proj, sport_upper)
-                        if leg is not None:
-                            legs.append(leg)
-                    logger.info(
-                        "Fetched %d PrizePicks projections for %s",
-                        len(odds_data), sport_upper,
-                    )
-                except Exception:
-                    logger.exception("Failed to fetch PrizePicks legs for %s", sport_upper)
-
-            # -- DraftKings game lines --
-            elif dk_broker is not None and sport_upper in game_line_sports:
-                try:
+                for proj_id, proj in odds_data.items():
+                    leg = self._prizepicks_projection_to_leg(proj_id, proj, sport_upper)
+                    if leg is not None:
+                        legs.append(leg)
+                logger.info(
+                    "Fetched %d PrizePicks projections for %s",
+                    len(odds_data), sport_upper,
+                )
+            except Exception:
+                logger.exception("Failed to fetch PrizePicks legs for %s", sport_upper)
+
+        # -- DraftKings game lines --
+        elif dk_broker is not None and sport_upper in self._GAME_LINE_SPORTS:
+            try:
+                async with broker_slot(dk_broker):
                     odds_data = await dk_broker.get_odds(sport, [])
-                    for event_id, game in odds_data.items():
-                        new_legs = self._dk_game_to_legs(event_id, game, sport_upper)
-                        legs.extend(new_legs)
-                    logger.info(
-                        "Fetched %d DraftKings games for %s",
-                        len(odds_data), sport_upper,
-                    )
-                except Exception:
-                    logger.exception("Failed to fetch DraftKings legs for %s", sport_upper)
+                for event_id, game in odds_data.items():
+                    legs.extend(self._dk_game_to_legs(event_id, game, sport_upper))
+                logger.info(
+                    "Fetched %d DraftKings games for %s",
+                    len(odds_data), sport_upper,
+                )
+            except Exception:
+                logger.exception("Failed to fetch DraftKings legs for %s", sport_upper)
 
-        logger.info("Total candidate legs fetched: %d", len(legs))
         return legs
 
     # ------------------------------------------------------------------
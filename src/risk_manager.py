@@ -13,16 +13,19 @@ import json
 import logging
 import sqlite3
 import uuid
-from dataclasses import asdict, dataclass, field, is_dataclass
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
+from src.budget import BudgetManager
 from src.config import settings
 from src.optimization.parlay_builder import Parlay
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class Bet:
     """Record of a single placed bet."""
 
@@ -60,13 +63,21 @@ class RiskManager:
         kelly_fraction: float = 0.25,   # fractional Kelly for safety
         db_conn: sqlite3.Connection | None = None,
     ):
+        self._loss_limit = 0.0
+        self._max_daily_loss_pct = max_daily_loss_pct
         self.bankroll = bankroll
-        self.max_daily_loss_pct = max_daily_loss_pct
         self.max_exposure_pct = max_exposure_pct
         self.kelly_fraction = kelly_fraction
         self._db = db_conn
 
         self._bets: dict[str, Bet] = {}          # id -> Bet
+        # Ids of the bets still pending, in placement order (a dict used as an
+        # ordered set). Settled bets stay in _bets for the audit trail, so
+        # pending lookups read this instead of scanning.
+        self._pending: dict[str, None] = {}
+        # (total_stake, by_broker, by_sport) over the pending bets; cleared
+        # whenever a bet is recorded or settled.
+        self._exposure_cache: tuple[float, dict[str, float], dict[str, float]] | None = None
         self._daily_pnl: float = 0.0
         self._is_cooling_down: bool = False
         # Asyncio lock guards state mutations when concurrent coroutines
@@ -111,6 +122,8 @@ class RiskManager:
                 settled_at=datetime.fromisoformat(row["settled_at"]) if row["settled_at"] else None,
             )
             self._bets[bet.id] = bet
+            if bet.status == "pending":
+                self._pending[bet.id] = None
 
         # Restore runtime scalars
         saved_bankroll = load_state(self._db, "bankroll")
@@ -139,15 +152,6 @@ class RiskManager:
         save_state(self._db, "daily_pnl", str(self._daily_pnl))
         save_state(self._db, "is_cooling_down", "1" if self._is_cooling_down else "0")
 
-    @staticmethod
-    def _serialize_leg(leg: object) -> dict:
-        """Convert a parlay leg into a JSON-serializable mapping."""
-        if is_dataclass(leg):
-            return asdict(leg)
-        if isinstance(leg, dict):
-            return dict(leg)
-        return vars(leg)
-
     # ------------------------------------------------------------------
     # Read-only properties for observability / testing
     # ------------------------------------------------------------------
@@ -162,6 +166,31 @@ class RiskManager:
         """True when the stop-loss has been triggered and no bets should be placed."""
         return self._is_cooling_down
 
+    @property
+    def bankroll(self) -> float:
+        """Current bankroll; setting it also refreshes :attr:`loss_limit`."""
+        return self._bankroll
+
+    @bankroll.setter
+    def bankroll(self, value: float) -> None:
+        self._bankroll = value
+        self._loss_limit = value * self._max_daily_loss_pct
+
+    @property
+    def max_daily_loss_pct(self) -> float:
+        """Daily loss limit as a fraction of bankroll."""
+        return self._max_daily_loss_pct
+
+    @max_daily_loss_pct.setter
+    def max_daily_loss_pct(self, value: float) -> None:
+        self._max_daily_loss_pct = value
+        self._loss_limit = self._bankroll * value
+
+    @property
+    def loss_limit(self) -> float:
+        """Daily loss (as a positive amount) that triggers the stop-loss."""
+        return self._loss_limit
+
     # ------------------------------------------------------------------
     # Bankroll management — Kelly criterion
     # ------------------------------------------------------------------
@@ -216,6 +245,47 @@ class RiskManager:
         )
         return round(stake, 2)
 
+    def prepare_placement(
+        self, parlay: Parlay, budget_manager: BudgetManager | None = None
+    ) -> tuple[float, str | None]:
+        """
+        Size a parlay's stake and run the per-bet placement gates in one call.
+
+        Parameters
+        ----------
+        parlay:
+            The candidate Parlay.
+        budget_manager:
+            Optional budget limits to check the sized stake against.
+
+        Returns
+        -------
+        ``(stake, None)`` if the bet may be placed, otherwise ``(0.0, reason)``.
+        Stop-loss and exposure limits halt the whole session, so callers
+        check those separately.
+        """
+        win_probability = parlay.win_probability
+        # win_probability == 0.0 is the sentinel for "not provided by optimizer".
+        if win_probability > 0:
+            stake = self.kelly_stake(win_probability, parlay.odds)
+            if stake == 0.0:
+                return 0.0, "Kelly stake is zero"
+        else:
+            stake = parlay.recommended_stake
+
+        stake = min(stake, settings.MAX_DAILY_STAKE)
+
+        if 0 < win_probability < settings.MIN_WIN_PROBABILITY:
+            return 0.0, (
+                f"win_prob={win_probability:.3f} below "
+                f"MIN_WIN_PROBABILITY={settings.MIN_WIN_PROBABILITY:.3f}"
+            )
+
+        if budget_manager is not None and not budget_manager.can_spend(stake, sport=parlay.sport):
+            return 0.0, f"budget limit would be breached (stake={stake:.2f})"
+
+        return stake, None
+
     # ------------------------------------------------------------------
     # Stop-loss and cool-down
     # ------------------------------------------------------------------
@@ -231,7 +301,7 @@ class RiskManager:
             logger.warning("Cool-down active — no new bets allowed.")
             return True
 
-        loss_limit = self.bankroll * self.max_daily_loss_pct
+        loss_limit = self._loss_limit
         if self._daily_pnl <= -loss_limit:
             self._is_cooling_down = True
             self._persist_state()
@@ -260,27 +330,50 @@ class RiskManager:
         Return current open exposure broken down by broker and sport.
 
         Returns a dict with total open stake and per-dimension breakdowns.
+        The aggregates are cached until a bet is recorded or settled.
         """
-        open_bets = [b for b in self._bets.values() if b.status == "pending"]
-        total_stake = sum(b.stake for b in open_bets)
-
-        by_broker: dict[str, float] = {}
-        by_sport: dict[str, float] = {}
-        for b in open_bets:
-            by_broker[b.broker_name] = by_broker.get(b.broker_name, 0.0) + b.stake
-            by_sport[b.sport] = by_sport.get(b.sport, 0.0) + b.stake
+        total_stake, by_broker, by_sport = self._exposure()
 
         if self.bankroll <= 0:
             logger.warning("Bankroll is non-positive (%.2f) — exposure percentage is unavailable.", self.bankroll)
 
         return {
             "total_open_stake": round(total_stake, 2),
-            "open_bet_count": len(open_bets),
-            "by_broker": by_broker,
-            "by_sport": by_sport,
-            "exposure_pct": round(total_stake / self.bankroll * 100, 2) if self.bankroll > 0 else 0.0,
+            "open_bet_count": len(self._pending),
+            "by_broker": dict(by_broker),
+            "by_sport": dict(by_sport),
+            "exposure_pct": self.exposure_pct(),
         }
 
+    def exposure_pct(self) -> float:
+        """Open stake as a percentage of bankroll (0.0 if bankroll is non-positive)."""
+        bankroll = self.bankroll
+        if bankroll <= 0:
+            return 0.0
+        return round(self._exposure()[0] / bankroll * 100, 2)
+
+    def _exposure(self) -> tuple[float, dict[str, float], dict[str, float]]:
+        """
+        Return ``(total_stake, by_broker, by_sport)`` over the pending bets.
+
+        Cached until a bet is recorded or settled; callers must not mutate
+        the dicts.
+        """
+        exposure = self._exposure_cache
+        if exposure is None:
+            total_stake = 0.0
+            by_broker: defaultdict[str, float] = defaultdict(float)
+            by_sport: defaultdict[str, float] = defaultdict(float)
+            bets = self._bets
+            for bet_id in self._pending:
+                b = bets[bet_id]
+                stake = b.stake
+                total_stake += stake
+                by_broker[b.broker_name] += stake
+                by_sport[b.sport] += stake
+            exposure = self._exposure_cache = (total_stake, dict(by_broker), dict(by_sport))
+        return exposure
+
     async def get_all_bets(self) -> list[Bet]:
         """Return a snapshot of all bets."""
         async with self._lock:
@@ -290,7 +383,13 @@ class RiskManager:
     # Audit trail
     # ------------------------------------------------------------------
 
-    async def record_bet(self, parlay: Parlay, bet_id: str, broker_name: str) -> Bet:
+    async def record_bet(
+        self,
+        parlay: Parlay,
+        bet_id: str,
+        broker_name: str,
+        placed_at: datetime | None = None,
+    ) -> Bet:
         """
         Record a newly placed bet for audit-trail and exposure tracking.
 
@@ -302,40 +401,127 @@ class RiskManager:
             Broker-assigned confirmation ID.
         broker_name:
             Key identifying the broker (e.g. "draftkings", "prizepicks").
+        placed_at:
+            Placement time (defaults to now).
         """
-        stake = parlay.recommended_stake
+        bet = self._new_bet(parlay, bet_id, broker_name, placed_at or datetime.now(timezone.utc))
+        async with self._lock:
+            self._store_bet(bet)
+        return bet
+
+    async def record_bet_with_budget(
+        self,
+        parlay: Parlay,
+        bet_id: str,
+        broker_name: str,
+        stake: float,
+        budget_manager: BudgetManager | None = None,
+    ) -> Bet:
+        """
+        Record a placed bet and its budget spend together, under one lock.
+
+        Parameters
+        ----------
+        parlay, bet_id, broker_name:
+            As for :meth:`record_bet`.
+        stake:
+            Amount actually staked; stored on the Bet and charged against
+            *budget_manager*.
+        budget_manager:
+            Budgets to record the spend in; skipped when None.
+
+        Both records share one timestamp, and the spend is validated before
+        either is written.
+        """
+        if budget_manager is not None and stake <= 0:
+            raise ValueError(f"Spend amount must be positive, got {stake}")
+        now = datetime.now(timezone.utc)
+        bet = self._new_bet(parlay, bet_id, broker_name, now, stake)
+        async with self._lock:
+            self._store_bet(bet)
+            if budget_manager is not None:
+                budget_manager.record_spend(
+                    bet_id, stake, sport=parlay.sport, sportsbook=broker_name, timestamp=now
+                )
+        return bet
+
+    async def record_bets(
+        self,
+        items: Iterable[tuple[Parlay, str, str]],
+        placed_at: datetime | None = None,
+    ) -> list[Bet]:
+        """
+        Record several placed bets at once, all sharing one placement time.
+
+        Parameters
+        ----------
+        items:
+            ``(parlay, bet_id, broker_name)`` tuples, as for :meth:`record_bet`.
+        placed_at:
+            Placement time for every bet (defaults to now, read once).
+
+        Every stake is checked against the bankroll before anything is
+        recorded.
+        """
+        now = placed_at or datetime.now(timezone.utc)
+        bets = [self._new_bet(parlay, bet_id, broker_name, now) for parlay, bet_id, broker_name in items]
+        async with self._lock:
+            for bet in bets:
+                self._store_bet(bet)
+        return bets
+
+    def _new_bet(
+        self,
+        parlay: Parlay,
+        bet_id: str,
+        broker_name: str,
+        placed_at: datetime,
+        stake: float | None = None,
+    ) -> Bet:
+        """
+        Build a Bet from a placed parlay, rejecting stakes above the bankroll.
+
+        *stake* is the amount actually placed; it defaults to the parlay's
+        recommended stake.
+        """
+        if stake is None:
+            stake = parlay.recommended_stake
         if stake > self.bankroll:
             raise ValueError(f"Insufficient bankroll: ${self.bankroll:.2f} < ${stake:.2f}")
 
-        record_id = str(uuid.uuid4())
-        legs = [self._serialize_leg(leg) for leg in parlay.legs]
-        bet = Bet(
-            id=record_id,
+        return Bet(
+            id=str(uuid.uuid4()),
             bet_id=bet_id,
             broker_name=broker_name,
             sport=parlay.sport,
-            legs=legs,
+            legs=list(parlay.leg_payloads()),
             stake=stake,
             odds=parlay.odds,
             expected_value=parlay.expected_value,
+            placed_at=placed_at,
         )
-        async with self._lock:
-            self._persist_bet(bet)
-            self._bets[record_id] = bet
+
+    def _store_bet(self, bet: Bet) -> None:
+        """Persist and index a new bet; caller holds the lock."""
+        self._persist_bet(bet)
+        self._bets[bet.id] = bet
+        if bet.status == "pending":
+            self._pending[bet.id] = None
+        self._exposure_cache = None
         logger.info(
             "Bet recorded | id=%s bet_id=%s broker=%s sport=%s stake=%.2f",
-            record_id,
-            bet_id,
-            broker_name,
+            bet.id,
+            bet.bet_id,
+            bet.broker_name,
             bet.sport,
             bet.stake,
         )
-        return bet
 
     async def get_pending_bets(self) -> list[Bet]:
         """Return all bets that have not yet been settled."""
         async with self._lock:
-            return [b for b in self._bets.values() if b.status == "pending"]
+            bets = self._bets
+            return [bets[bet_id] for bet_id in self._pending]
 
     async def settle_bet(self, bet_internal_id: str, result: str) -> Bet | None:
         """
@@ -357,6 +543,8 @@ class RiskManager:
             bet.status = result
             bet.result = result
             bet.settled_at = datetime.now(timezone.utc)
+            self._pending.pop(bet_internal_id, None)
+            self._exposure_cache = None
 
             if result == "won":
                 profit = bet.stake * (bet.odds - 1)
@@ -15,18 +15,44 @@ Usage (FastAPI lifespan):
         scheduler.shutdown()
 """
 
+import asyncio
 import logging
+from collections import defaultdict
 
+import httpx
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
 
 from src.brokers.draftkings import DraftKingsBroker
 from src.brokers.prizepicks import PrizePicksBroker
 from src.brokers.oddsapi import OddsApiBroker
-from src.brokers.base import SportsbookBroker
+from src.brokers.base import SportsbookBroker, broker_slot
 from src.config import settings
+from src.optimization.parlay_builder import ParlayOptimizer
 
 logger = logging.getLogger(__name__)
 
+# APScheduler defaults for every job; misfire_grace_time allows up to a
+# 5 min late start.
+_JOB_DEFAULTS = {"coalesce": True, "max_instances": 1, "misfire_grace_time": 300}
+
+# Cron triggers, built once and pinned to SCHEDULER_TZ so fire times don't
+# shift with the host's local timezone or DST.
+_RESET_TRIGGER = CronTrigger(hour=0, minute=0, timezone=settings.SCHEDULER_TZ)
+_ASSESSMENT_TRIGGER = CronTrigger(hour=9, minute=0, timezone=settings.SCHEDULER_TZ)
+_RESOLVE_TRIGGER = CronTrigger(minute=5, timezone=settings.SCHEDULER_TZ)  # HH:05 every hour
+
+# Broker failures treated as routine (logged without a traceback).
+_TRANSIENT_BROKER_ERRORS = (httpx.TransportError, asyncio.TimeoutError, ConnectionError)
+
+# Sports routed to a game-line book (spreads/totals/ML) rather than props.
+_GAME_LINE_SPORTS = frozenset({"NFL", "NBA", "NHL", "MLB", "NCAAFB", "NCAAMB"})
+
+# Broker preference per sport, best first; unlisted sports go to props.
+_GAME_LINE_ROUTE = ("oddsapi", "draftkings", "prizepicks")
+_PROP_ROUTE = ("prizepicks",)
+_SPORT_ROUTE: dict[str, tuple[str, ...]] = dict.fromkeys(_GAME_LINE_SPORTS, _GAME_LINE_ROUTE)
+
 # ---------------------------------------------------------------------------
 # Broker routing helpers
 # ---------------------------------------------------------------------------
@@ -64,9 +90,26 @@ def _build_brokers() -> dict[str, SportsbookBroker]:
     else:
         logger.info("OddsApiBroker skipped -- THE_ODDS_API_KEY not set.")
 
+    # One in-flight limiter per broker, shared by every job and the optimizer.
+    for broker in brokers.values():
+        broker.inflight_limit = asyncio.Semaphore(settings.BROKER_MAX_INFLIGHT)
+
     return brokers
 
 
+# Fallback broker set for jobs run without app.state.brokers; built once so
+# the HTTP clients (and their keep-alive pools) survive between ticks.
+_BROKERS: dict[str, SportsbookBroker] | None = None
+
+
+def _get_brokers() -> dict[str, SportsbookBroker]:
+    """Return the shared fallback broker set, building it on first use."""
+    global _BROKERS
+    if _BROKERS is None:
+        _BROKERS = _build_brokers()
+    return _BROKERS
+
+
 def _select_broker(
     brokers: dict[str, SportsbookBroker], sport: str
 ) -> tuple[str, SportsbookBroker]:
@@ -77,16 +120,12 @@ def _select_broker(
       2. DraftKings (game lines: spreads/totals/ML)
       3. PrizePicks (player props fallback)
     """
-    game_line_sports = {"NFL", "NBA", "NHL", "MLB", "NCAAFB", "NCAAMB"}
-
-    # Prefer Odds API for game-line sports (aggregates 40+ books)
-    if sport.upper() in game_line_sports and "oddsapi" in brokers:
-        return "oddsapi", brokers["oddsapi"]
-
-    # Fallback to DraftKings for game lines
-    if sport.upper() in game_line_sports and "draftkings" in brokers:
-        return "draftkings", brokers["draftkings"]
-
+    # Sports normally arrive already upper-case from settings; only
+    # case-fold on a miss.
+    route = _SPORT_ROUTE.get(sport) or _SPORT_ROUTE.get(sport.upper(), _PROP_ROUTE)
+    for name in route:
+        if name in brokers:
+            return name, brokers[name]
     return "prizepicks", brokers["prizepicks"]
 
 
@@ -148,6 +187,25 @@ def validate_edge(parlay, current_odds: dict) -> bool:
     return True
 
 
+async def _get_odds(broker: SportsbookBroker, sport: str, event_ids: list[str]) -> dict:
+    """Fetch odds from *broker* while holding one of its in-flight slots."""
+    async with broker_slot(broker):
+        return await broker.get_odds(sport, event_ids)
+
+
+def _log_broker_error(exc: BaseException, msg: str, *args) -> None:
+    """
+    Log a failed broker call.
+
+    Network hiccups and timeouts are expected from sportsbook APIs and are
+    logged as one-line warnings; anything else gets a full traceback.
+    """
+    if isinstance(exc, _TRANSIENT_BROKER_ERRORS):
+        logger.warning(msg + " (%s: %s)", *args, type(exc).__name__, exc)
+    else:
+        logger.error(msg, *args, exc_info=exc)
+
+
 # ---------------------------------------------------------------------------
 # Scheduled tasks
 # ---------------------------------------------------------------------------
@@ -155,13 +213,13 @@ def validate_edge(parlay, current_odds: dict) -> bool:
 
 async def daily_bet_assessment(app) -> None:
     """
-    Run once per day (default 09:00 local).
+    Run once per day (default 09:00 SCHEDULER_TZ).
     1. Generate optimised parlays via ParlayOptimizer.
     2. Validate edge against live odds.
     3. Place top-N bets (capped by MAX_BETS_PER_DAY) and record them.
     """
     logger.info("=== Daily bet assessment starting ===")
-    brokers = getattr(app.state, "brokers", None) or _build_brokers()
+    brokers = getattr(app.state, "brokers", None) or _get_brokers()
     risk_manager = app.state.risk_manager
 
     # Enforce stop-loss / cool-down before doing any work
@@ -169,8 +227,6 @@ async def daily_bet_assessment(app) -> None:
         logger.warning("Daily assessment aborted -- stop-loss/cool-down is active.")
         return
 
-    from src.optimization.parlay_builder import ParlayOptimizer
-
     try:
         optimizer = ParlayOptimizer(
             risk_profile="balanced",
@@ -191,7 +247,24 @@ async def daily_bet_assessment(app) -> None:
     max_bets = settings.MAX_BETS_PER_DAY
     budget_manager = getattr(app.state, "budget_manager", None)
 
-    for parlay in parlays[:max_bets]:  # cap at MAX_BETS_PER_DAY
+    # Fetch live odds up front: one request per (broker, sport) covering the
+    # union of its parlays' events, all concurrently. Placement below stays
+    # sequential.
+    candidates = parlays[:max_bets]  # cap at MAX_BETS_PER_DAY
+    routes = [_select_broker(brokers, parlay.sport) for parlay in candidates]
+    events: dict[tuple[str, str], dict[str, None]] = {}
+    for parlay, (name, _) in zip(candidates, routes):
+        events.setdefault((name, parlay.sport), {}).update(
+            dict.fromkeys(leg.event_id for leg in parlay.legs)
+        )
+    keys = list(events)
+    odds_by_key = dict(zip(keys, await asyncio.gather(
+        *(_get_odds(brokers[name], sport, list(events[name, sport])) for name, sport in keys),
+        return_exceptions=True,
+    )))
+    fetched = [odds_by_key[name, parlay.sport] for parlay, (name, _) in zip(candidates, routes)]
+
+    for parlay, (broker_name, broker), current_odds in zip(candidates, routes, fetched):
         if placed >= max_bets:
             break
 
@@ -202,80 +275,43 @@ async def daily_bet_assessment(app) -> None:
             )
             break
 
-        exposure = risk_manager.get_exposure()
-        if exposure["exposure_pct"] >= risk_manager.max_exposure_pct * 100:
+        exposure_pct = risk_manager.exposure_pct()
+        if exposure_pct >= risk_manager.max_exposure_pct * 100:
             logger.warning(
                 "Exposure limit reached (%.1f%%) -- skipping remaining parlays.",
-                exposure["exposure_pct"],
+                exposure_pct,
             )
             break
 
-        broker_name, broker = _select_broker(brokers, parlay.sport)
         try:
-            event_ids = [leg.event_id for leg in parlay.legs]
-            current_odds = await broker.get_odds(parlay.sport, event_ids)
+            if isinstance(current_odds, BaseException):
+                raise current_odds
 
             if not validate_edge(parlay, current_odds):
                 logger.info("Edge no longer valid for parlay %s, skipping", parlay.id)
                 continue
 
-            # Use Kelly criterion for stake sizing when win probability is available.
-            # win_probability == 0.0 is the sentinel for "not provided by optimizer".
-            if parlay.win_probability > 0:
-                stake = risk_manager.kelly_stake(parlay.win_probability, parlay.odds)
-                if stake == 0.0:
-                    logger.info(
-                        "Kelly stake is zero for parlay %s -- skipping", parlay.id
-                    )
-                    continue
-            else:
-                stake = parlay.recommended_stake
-
-            # Cap stake to MAX_DAILY_STAKE from config
-            stake = min(stake, settings.MAX_DAILY_STAKE)
-
-            # Apply MIN_WIN_PROBABILITY gate from config
-            if (
-                parlay.win_probability > 0
-                and parlay.win_probability < settings.MIN_WIN_PROBABILITY
-            ):
-                logger.info(
-                    "Parlay %s win_prob=%.3f below MIN_WIN_PROBABILITY=%.3f -- skipping",
-                    parlay.id,
-                    parlay.win_probability,
-                    settings.MIN_WIN_PROBABILITY,
-                )
+            stake, reason = risk_manager.prepare_placement(parlay, budget_manager)
+            if reason is not None:
+                logger.info("Skipping parlay %s -- %s", parlay.id, reason)
                 continue
 
-            # Check budget before placing
-            if budget_manager is not None and not budget_manager.can_spend(
-                stake, sport=parlay.sport
-            ):
-                logger.warning(
-                    "Budget limit would be breached for parlay %s (stake=%.2f) -- skipping.",
-                    parlay.id,
-                    stake,
+            async with broker_slot(broker):
+                bet_id = await broker.place_bet(
+                    legs=parlay.leg_payloads(),
+                    stake=stake,
+                    odds=parlay.odds,
                 )
-                continue
-
-            bet_id = await broker.place_bet(
-                legs=[leg.__dict__ for leg in parlay.legs],
-                stake=stake,
-                odds=parlay.odds,
+            await risk_manager.record_bet_with_budget(
+                parlay, bet_id, broker_name, stake, budget_manager
             )
-            await risk_manager.record_bet(parlay, bet_id, broker_name)
-            # Record spend in budget manager
-            if budget_manager is not None:
-                budget_manager.record_spend(
-                    bet_id, stake, sport=parlay.sport, sportsbook=broker_name
-                )
             logger.info(
                 "Placed bet %s via %s (parlay %s)", bet_id, broker_name, parlay.id
             )
             placed += 1
 
-        except Exception:
-            logger.exception("Failed to place parlay %s", getattr(parlay, "id", "?"))
+        except Exception as exc:
+            _log_broker_error(exc, "Failed to place parlay %s", getattr(parlay, "id", "?"))
 
     logger.info("=== Daily assessment complete -- %d bet(s) placed ===", placed)
 
@@ -285,7 +321,7 @@ async def resolve_bets(app) -> None:
     Run hourly -- check pending bets and settle any that have results.
     """
     logger.info("Checking pending bets for settlement...")
-    brokers = getattr(app.state, "brokers", None) or _build_brokers()
+    brokers = getattr(app.state, "brokers", None) or _get_brokers()
 
     try:
         pending = await app.state.risk_manager.get_pending_bets()
@@ -293,23 +329,48 @@ async def resolve_bets(app) -> None:
         logger.exception("Could not fetch pending bets")
         return
 
-    settled_count = 0
+    by_broker: defaultdict[str, list] = defaultdict(list)
     for bet in pending:
-        broker = brokers.get(bet.broker_name)
-        if broker is None:
+        if bet.broker_name not in brokers:
             logger.warning(
                 "Unknown broker '%s' for bet %s", bet.broker_name, bet.bet_id
             )
             continue
+        by_broker[bet.broker_name].append(bet)
+
+    # One status request per broker, all brokers concurrently; settlement
+    # stays sequential because it mutates the bankroll.
+    names = list(by_broker)
+    batches = await asyncio.gather(
+        *(brokers[name].check_bet_statuses([bet.bet_id for bet in by_broker[name]]) for name in names),
+        return_exceptions=True,
+    )
+    statuses = {}
+    for name, batch in zip(names, batches):
+        if isinstance(batch, BaseException):
+            # Report a failed batch once rather than once per bet in it.
+            _log_broker_error(
+                batch, "Status check failed for %d %s bet(s)", len(by_broker[name]), name
+            )
+            continue
+        statuses[name] = batch
+
+    settled_count = 0
+    for bet in pending:
+        batch = statuses.get(bet.broker_name)
+        if batch is None:
+            continue
         try:
-            status = await broker.check_bet_status(bet.bet_id)
+            status = batch[bet.bet_id]
+            if isinstance(status, BaseException):
+                raise status
             if status.get("status") == "settled":
                 result = status.get("result", "void")
                 await app.state.risk_manager.settle_bet(bet.id, result)
                 logger.info("Settled bet %s: result=%s", bet.bet_id, result)
                 settled_count += 1
-        except Exception:
-            logger.exception("Error resolving bet %s", bet.bet_id)
+        except Exception as exc:
+            _log_broker_error(exc, "Error resolving bet %s", bet.bet_id)
 
     logger.info(
         "Bet resolution complete -- %d settled out of %d pending",
@@ -319,9 +380,15 @@ async def resolve_bets(app) -> None:
 
 
 async def reset_daily_limits(app) -> None:
-    """Reset stop-loss and daily P&L at the start of each trading day (00:00)."""
+    """
+    Reset stop-loss and daily P&L at the start of each trading day (00:00),
+    and roll up budget entries that have aged out of every budget window.
+    """
     app.state.risk_manager.reset_daily_limits()
     logger.info("Daily risk limits reset.")
+    budget_manager = getattr(app.state, "budget_manager", None)
+    if budget_manager is not None:
+        budget_manager.nightly_rollup()
 
 
 # ---------------------------------------------------------------------------
@@ -334,39 +401,34 @@ def create_scheduler(app) -> AsyncIOScheduler:
     Build and return a configured AsyncIOScheduler.
     Call scheduler.start() in your app lifespan, scheduler.shutdown() on teardown.
 
-    Jobs:
+    Jobs (times in SCHEDULER_TZ, UTC by default):
         - reset_daily_limits    -> every day at 00:00
         - daily_bet_assessment  -> every day at 09:00
         - resolve_bets          -> every hour at :05 past the hour
     """
-    scheduler = AsyncIOScheduler()
+    # Jobs touch shared risk/budget state: never run two copies of one job,
+    # and collapse a backlog of missed runs into a single catch-up run.
+    scheduler = AsyncIOScheduler(job_defaults=_JOB_DEFAULTS, timezone=settings.SCHEDULER_TZ)
 
     scheduler.add_job(
         reset_daily_limits,
-        trigger="cron",
-        hour=0,
-        minute=0,
+        trigger=_RESET_TRIGGER,
         id="reset_daily_limits",
         args=[app],
         replace_existing=True,
-        misfire_grace_time=300,
     )
 
     scheduler.add_job(
         daily_bet_assessment,
-        trigger="cron",
-        hour=9,
-        minute=0,
+        trigger=_ASSESSMENT_TRIGGER,
         id="daily_bet_assessment",
         args=[app],
         replace_existing=True,
-        misfire_grace_time=300,  # allow up to 5 min late start
     )
 
     scheduler.add_job(
         resolve_bets,
-        trigger="cron",
-        minute=5,  # runs at HH:05 every hour
+        trigger=_RESOLVE_TRIGGER,
         id="resolve_bets",
         args=[app],
         replace_existing=True,
@@ -374,7 +436,8 @@ def create_scheduler(app) -> AsyncIOScheduler:
     )
 
     logger.info(
-        "Scheduler configured: reset_daily_limits @ 00:00, "
-        "daily_bet_assessment @ 09:00, resolve_bets @ *:05"
+        "Scheduler configured (%s): reset_daily_limits @ 00:00, "
+        "daily_bet_assessment @ 09:00, resolve_bets @ *:05",
+        settings.SCHEDULER_TZ,
     )
     return scheduler
@@ -9,13 +9,14 @@ Odds API closing lines vs PrizePicks lines.
 """
 
 import logging
+import operator
 from dataclasses import dataclass
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class MatchedPick:
     """A PrizePicks projection matched to Odds API lines for edge analysis."""
 
@@ -152,7 +153,7 @@ class PicksMatcher:
                 logger.exception("PicksMatcher failed for sport=%s", sport)
 
         # Sort by edge descending
-        matched.sort(key=lambda x: x.edge, reverse=True)
+        matched.sort(key=operator.attrgetter("edge"), reverse=True)
 
         logger.info(
             "PicksMatcher: matched %d picks (min_edge=%.2f)", len(matched), min_edge
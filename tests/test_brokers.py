@@ -57,6 +57,19 @@ class TestPrizePicksBroker:
         status = await broker.check_bet_status("SOME_REAL_ID_123")
         assert status["status"] == "unknown"
 
+    @pytest.mark.asyncio
+    async def test_check_bet_statuses_keys_by_bet_id(self, broker):
+        mock_id = f"PP_MOCK_{int(time.time())}"
+        statuses = await broker.check_bet_statuses([mock_id, "SOME_REAL_ID_123"])
+        assert statuses[mock_id]["status"] == "pending"
+        assert statuses["SOME_REAL_ID_123"]["status"] == "unknown"
+
+    def test_backoff_is_exponential_with_jitter(self, broker):
+        broker.retry_delay = 2.0
+        for attempt, base in [(1, 2.0), (2, 4.0), (3, 8.0), (10, 30.0)]:
+            wait = broker._backoff(attempt)
+            assert base * 0.5 <= wait <= base
+
     def test_league_map_has_expected_sports(self, broker):
         expected = {"NBA", "NFL", "NHL", "MLB"}
         assert expected.issubset(set(broker.LEAGUE_MAP.keys()))
@@ -115,6 +128,104 @@ class TestSchedulerHelpers:
         assert rm.is_cooling_down is False
         assert rm.daily_pnl == 0.0
 
+    @pytest.mark.asyncio
+    async def test_resolve_bets_isolates_broker_failures(self):
+        from src.brokers.base import SportsbookBroker
+        from src.scheduler import resolve_bets
+        from src.risk_manager import RiskManager
+        from src.optimization.parlay_builder import Parlay
+
+        class FakeBroker(SportsbookBroker):
+            async def get_odds(self, sport, event_ids):
+                return {}
+
+            async def place_bet(self, legs, stake, odds):
+                raise NotImplementedError
+
+            async def check_bet_status(self, bet_id):
+                if bet_id == "BAD":
+                    raise RuntimeError("boom")
+                return {"status": "settled", "result": "won"}
+
+        class FakeApp:
+            pass
+
+        fake_app = FakeApp()
+        fake_app.state = FakeApp()
+        rm = RiskManager(bankroll=1_000.0)
+        fake_app.state.risk_manager = rm
+        fake_app.state.brokers = {"draftkings": FakeBroker()}
+
+        for bet_id in ("OK1", "BAD", "OK2"):
+            parlay = Parlay(id=bet_id, sport="NFL", odds=2.0, recommended_stake=10.0)
+            await rm.record_bet(parlay, bet_id, "draftkings")
+
+        await resolve_bets(fake_app)
+        pending = await rm.get_pending_bets()
+        assert [b.bet_id for b in pending] == ["BAD"]
+
+    @pytest.mark.asyncio
+    async def test_resolve_bets_logs_transient_errors_without_traceback(self, caplog):
+        import httpx
+        from src.brokers.base import SportsbookBroker
+        from src.scheduler import resolve_bets
+        from src.risk_manager import RiskManager
+        from src.optimization.parlay_builder import Parlay
+
+        class FlakyBroker(SportsbookBroker):
+            async def get_odds(self, sport, event_ids):
+                return {}
+
+            async def place_bet(self, legs, stake, odds):
+                raise NotImplementedError
+
+            async def check_bet_status(self, bet_id):
+                raise httpx.ConnectTimeout("timed out")
+
+        class FakeApp:
+            pass
+
+        fake_app = FakeApp()
+        fake_app.state = FakeApp()
+        rm = RiskManager(bankroll=1_000.0)
+        fake_app.state.risk_manager = rm
+        fake_app.state.brokers = {"draftkings": FlakyBroker()}
+        parlay = Parlay(id="T1", sport="NFL", odds=2.0, recommended_stake=10.0)
+        await rm.record_bet(parlay, "T1", "draftkings")
+
+        with caplog.at_level("WARNING", logger="src.scheduler"):
+            await resolve_bets(fake_app)
+        records = [r for r in caplog.records if "T1" in r.getMessage()]
+        assert records and all(r.levelname == "WARNING" and not r.exc_info for r in records)
+        assert len(await rm.get_pending_bets()) == 1
+
+
+    @pytest.mark.asyncio
+    async def test_check_bet_statuses_respects_inflight_limit(self):
+        import asyncio
+        from src.brokers.base import SportsbookBroker
+
+        class SlowBroker(SportsbookBroker):
+            active = peak = 0
+
+            async def get_odds(self, sport, event_ids):
+                return {}
+
+            async def place_bet(self, legs, stake, odds):
+                raise NotImplementedError
+
+            async def check_bet_status(self, bet_id):
+                type(self).active += 1
+                type(self).peak = max(self.peak, self.active)
+                await asyncio.sleep(0)
+                type(self).active -= 1
+                return {"status": "pending"}
+
+        broker = SlowBroker()
+        broker.inflight_limit = asyncio.Semaphore(2)
+        statuses = await broker.check_bet_statuses([f"B{i}" for i in range(6)])
+        assert len(statuses) == 6
+        assert SlowBroker.peak == 2
 
 # ---------------------------------------------------------------------------
 # Config
@@ -192,6 +303,24 @@ class TestRiskManagerKelly:
         assert self.rm.kelly_stake(win_probability=0.6, decimal_odds=1.0) == 0.0
         assert self.rm.kelly_stake(win_probability=0.6, decimal_odds=0.5) == 0.0
 
+    def test_prepare_placement_gates(self):
+        from src.budget import BudgetManager, BudgetPeriod
+        from src.config import settings
+        from src.optimization.parlay_builder import Parlay
+
+        parlay = Parlay(id="pp1", sport="NBA", odds=2.0, recommended_stake=30.0)
+        stake, reason = self.rm.prepare_placement(parlay)
+        assert (stake, reason) == (min(30.0, settings.MAX_DAILY_STAKE), None)
+
+        losing = Parlay(id="pp2", sport="NBA", odds=2.0, win_probability=0.40)
+        assert self.rm.prepare_placement(losing) == (0.0, "Kelly stake is zero")
+
+        bm = BudgetManager()
+        bm.add_budget(BudgetPeriod.DAILY, 10.0)
+        stake, reason = self.rm.prepare_placement(parlay, bm)
+        assert stake == 0.0
+        assert "budget" in reason
+
 
 class TestRiskManagerSnapshots:
     @pytest.mark.asyncio
@@ -218,6 +347,13 @@ class TestRiskManagerStopLoss:
     def test_no_stop_loss_initially(self):
         assert self.rm.check_stop_loss() is False
 
+    def test_loss_limit_tracks_bankroll(self):
+        assert self.rm.loss_limit == pytest.approx(100.0)
+        self.rm.bankroll = 500.0
+        assert self.rm.loss_limit == pytest.approx(50.0)
+        self.rm.max_daily_loss_pct = 0.20
+        assert self.rm.loss_limit == pytest.approx(100.0)
+
     @pytest.mark.asyncio
     async def test_stop_loss_triggered_after_loss(self):
         from src.optimization.parlay_builder import Parlay
@@ -268,20 +404,31 @@ class TestRiskManagerExposure:
             sport="NFL", legs=[], stake=50.0, odds=2.5,
             expected_value=0.1,
         )
-        self.rm._bets["b1"] = bet
+        self.rm._store_bet(bet)
         exposure = self.rm.get_exposure()
         assert exposure["total_open_stake"] == 50.0
         assert exposure["by_broker"]["draftkings"] == 50.0
         assert exposure["by_sport"]["NFL"] == 50.0
         assert exposure["exposure_pct"] == 5.0
 
+    @pytest.mark.asyncio
+    async def test_exposure_updates_after_settlement(self):
+        from src.optimization.parlay_builder import Parlay
+        parlay = Parlay(id="e1", sport="NBA", odds=2.0, recommended_stake=40.0)
+        bet = await self.rm.record_bet(parlay, "DK_E1", "draftkings")
+        assert self.rm.get_exposure()["total_open_stake"] == 40.0
+        assert self.rm.exposure_pct() == 4.0
+        await self.rm.settle_bet(bet.id, "won")
+        assert self.rm.get_exposure()["total_open_stake"] == 0.0
+        assert self.rm.exposure_pct() == 0.0
+
     def test_settled_bets_excluded_from_exposure(self):
         bet = self.Bet(
             id="b2", bet_id="DK_2", broker_name="draftkings",
             sport="NBA", legs=[], stake=100.0, odds=3.0,
             expected_value=0.2, status="won",
         )
-        self.rm._bets["b2"] = bet
+        self.rm._store_bet(bet)
         exposure = self.rm.get_exposure()
         assert exposure["total_open_stake"] == 0.0
 
@@ -293,7 +440,7 @@ class TestRiskManagerExposure:
             sport="NFL", legs=[], stake=50.0, odds=2.0,
             expected_value=0.05,
         )
-        self.rm._bets["b3"] = bet
+        self.rm._store_bet(bet)
         exposure = self.rm.get_exposure()
         assert exposure["total_open_stake"] == 50.0
         # When bankroll is zero, the implementation uses a conditional to avoid
@@ -308,7 +455,7 @@ class TestRiskManagerExposure:
             sport="NBA", legs=[], stake=75.0, odds=2.5,
             expected_value=0.08,
         )
-        self.rm._bets["b4"] = bet
+        self.rm._store_bet(bet)
         exposure = self.rm.get_exposure()
         assert exposure["total_open_stake"] == 75.0
         # For non-positive bankroll, the conditional path should again avoid
@@ -333,6 +480,56 @@ class TestRiskManagerAuditTrail:
         pending = await self.rm.get_pending_bets()
         assert len(pending) == 1
 
+    @pytest.mark.asyncio
+    async def test_pending_bets_keep_placement_order(self):
+        from src.optimization.parlay_builder import Parlay
+        ids = [f"DK_ORD_{i}" for i in range(12)]
+        bets = []
+        for bet_id in ids:
+            parlay = Parlay(id=bet_id, sport="NBA", odds=2.0, recommended_stake=10.0)
+            bets.append(await self.rm.record_bet(parlay, bet_id, "draftkings"))
+        await self.rm.settle_bet(bets[3].id, "won")
+        pending = await self.rm.get_pending_bets()
+        assert [b.bet_id for b in pending] == ids[:3] + ids[4:]
+
+    @pytest.mark.asyncio
+    async def test_record_bets_shares_placed_at(self):
+        from src.optimization.parlay_builder import Parlay
+        items = [
+            (Parlay(id="b1", sport="NBA", odds=2.0, recommended_stake=20.0), "DK_B1", "draftkings"),
+            (Parlay(id="b2", sport="NFL", odds=2.0, recommended_stake=30.0), "PP_B2", "prizepicks"),
+        ]
+        bets = await self.rm.record_bets(items)
+        assert [b.bet_id for b in bets] == ["DK_B1", "PP_B2"]
+        assert bets[0].placed_at == bets[1].placed_at
+        assert len(await self.rm.get_pending_bets()) == 2
+
+    @pytest.mark.asyncio
+    async def test_record_bet_with_budget_records_spend(self):
+        from src.budget import BudgetManager, BudgetPeriod
+        from src.optimization.parlay_builder import Parlay
+        bm = BudgetManager()
+        bm.add_budget(BudgetPeriod.DAILY, 100.0)
+        parlay = Parlay(id="wb1", sport="NBA", odds=2.0, recommended_stake=25.0)
+        bet = await self.rm.record_bet_with_budget(parlay, "DK_WB1", "draftkings", 20.0, bm)
+        assert bet.bet_id == "DK_WB1"
+        assert bm.spent_in_period(BudgetPeriod.DAILY) == pytest.approx(20.0)
+
+    @pytest.mark.asyncio
+    async def test_record_bet_with_budget_stores_placed_stake(self):
+        from src.budget import BudgetManager, BudgetPeriod
+        from src.optimization.parlay_builder import Parlay
+        bm = BudgetManager()
+        bm.add_budget(BudgetPeriod.DAILY, 100.0)
+        # prepare_placement can trim the stake below the recommendation
+        parlay = Parlay(id="wb2", sport="NBA", odds=2.0, recommended_stake=60.0)
+        bet = await self.rm.record_bet_with_budget(parlay, "DK_WB2", "draftkings", 15.0, bm)
+        assert bet.stake == 15.0
+        assert self.rm.get_exposure()["total_open_stake"] == 15.0
+        assert bm.spent_in_period(BudgetPeriod.DAILY) == pytest.approx(15.0)
+        await self.rm.settle_bet(bet.id, "lost")
+        assert self.rm.bankroll == 985.0
+
     @pytest.mark.asyncio
     async def test_settle_bet_won_updates_bankroll(self):
         from src.optimization.parlay_builder import Parlay
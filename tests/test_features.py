@@ -3,6 +3,16 @@
 import pytest
 from datetime import datetime, timezone, date, timedelta
 
+from src.account_tracker import AccountTracker, SportsbookAccount
+from src.budget import Budget, BudgetManager, BudgetPeriod
+from src.circadian import CircadianAdjustment, CircadianFactoring, GameContext
+from src.config import Settings
+from src.database import get_connection, init_db
+from src.optimization.parlay_builder import Leg, ParlayBuilder, ParlayOptimizer
+
+# Game day shared by the circadian and parlay tests; callers pick the hour.
+_BASE_GAME = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
 # ---------------------------------------------------------------------------
 # Circadian factoring
 # ---------------------------------------------------------------------------
@@ -18,9 +28,8 @@ class TestCircadianFactoring:
         away_b2b: bool = False,
         home_b2b: bool = False,
     ):
-        from src.circadian import GameContext, CircadianFactoring
         ctx = GameContext(
-            game_time_utc=datetime(2024, 3, 1, utc_hour, 0, tzinfo=timezone.utc),
+            game_time_utc=_BASE_GAME.replace(hour=utc_hour),
             home_team_timezone_offset=home_tz,
             away_team_timezone_offset=away_tz,
             sport=sport,
@@ -30,7 +39,6 @@ class TestCircadianFactoring:
         return ctx
 
     def test_optimal_hour_gives_bonus(self):
-        from src.circadian import CircadianFactoring
         cf = CircadianFactoring()
         # UTC 20:00 + EST (-5) = 15:00 local → optimal window
         ctx = self._make_ctx(utc_hour=20, home_tz=-5.0)
@@ -38,7 +46,6 @@ class TestCircadianFactoring:
         assert adj.factor > 0
 
     def test_late_night_gives_penalty(self):
-        from src.circadian import CircadianFactoring
         cf = CircadianFactoring()
         # UTC 04:00 + EST (-5) = 23:00 local → late night penalty
         ctx = self._make_ctx(utc_hour=4, home_tz=-5.0)
@@ -46,7 +53,6 @@ class TestCircadianFactoring:
         assert adj.factor < 0
 
     def test_back_to_back_away_penalty(self):
-        from src.circadian import CircadianFactoring
         cf = CircadianFactoring()
         ctx = self._make_ctx(utc_hour=20, home_tz=-5.0, away_b2b=True)
         adj = cf.compute(ctx)
@@ -56,7 +62,6 @@ class TestCircadianFactoring:
         assert adj.factor < adj_no_b2b.factor
 
     def test_eastward_travel_penalty(self):
-        from src.circadian import CircadianFactoring
         cf = CircadianFactoring()
         # Away from LA (UTC-8) playing in New York (UTC-5): shift = -5 - (-8) = +3h eastward
         ctx = self._make_ctx(utc_hour=20, home_tz=-5.0, away_tz=-8.0)
@@ -66,47 +71,62 @@ class TestCircadianFactoring:
         assert adj.factor < adj_same.factor
 
     def test_non_sensitive_sport_no_adjustment(self):
-        from src.circadian import CircadianFactoring
         cf = CircadianFactoring()
         ctx = self._make_ctx(sport="GOLF")
         adj = cf.compute(ctx)
         assert adj.factor == 0.0
 
     def test_apply_scales_edge(self):
-        from src.circadian import CircadianAdjustment
         adj = CircadianAdjustment(factor=0.10)
         result = adj.apply(0.06)
         assert abs(result - 0.066) < 1e-9
 
     def test_apply_floors_at_zero(self):
-        from src.circadian import CircadianAdjustment
         adj = CircadianAdjustment(factor=-2.0)
         assert adj.apply(0.06) == 0.0
 
     def test_reasons_populated(self):
-        from src.circadian import CircadianFactoring
         cf = CircadianFactoring()
         ctx = self._make_ctx(utc_hour=4, home_tz=-5.0, away_b2b=True)
         adj = cf.compute(ctx)
         assert len(adj.reasons) >= 2
 
     def test_home_local_hour(self):
-        from src.circadian import GameContext
         ctx = GameContext(
-            game_time_utc=datetime(2024, 3, 1, 23, 0, tzinfo=timezone.utc),
+            game_time_utc=_BASE_GAME.replace(hour=23),
             home_team_timezone_offset=-5.0,
         )
         assert ctx.home_local_hour() == 18
 
     def test_away_travel_shift(self):
-        from src.circadian import GameContext
         ctx = GameContext(
-            game_time_utc=datetime(2024, 3, 1, 20, 0, tzinfo=timezone.utc),
+            game_time_utc=_BASE_GAME.replace(hour=20),
             home_team_timezone_offset=-5.0,
             away_team_timezone_offset=-8.0,
         )
         assert ctx.away_travel_shift() == 3.0
 
+    def test_compute_batch_matches_compute(self):
+        cf = CircadianFactoring()
+        ctxs = [
+            self._make_ctx(utc_hour=h, away_tz=away, sport=sport, away_b2b=b2b, home_b2b=not b2b)
+            for h in (0, 4, 15, 20)
+            for away in (-8.0, -5.0, -2.0)
+            for sport in ("NBA", "nhl", "GOLF")
+            for b2b in (False, True)
+        ]
+        assert cf.compute_batch(ctxs) == [cf.compute(ctx).factor for ctx in ctxs]
+
+    def test_compute_factor_values(self):
+        cf = CircadianFactoring()
+        # 23:00 local, away B2B, 3h eastward: -5% - 8% - 12%
+        late = self._make_ctx(utc_hour=4, away_tz=-8.0, away_b2b=True)
+        assert cf.compute_factor(late) == -0.25
+        # 15:00 local, home B2B, 3h westward: +2% - 4% + 5% (capped)
+        west = self._make_ctx(utc_hour=20, away_tz=-2.0, home_b2b=True)
+        assert cf.compute_factor(west) == 0.03
+        assert len(cf.explain(west)) == 3
+
 
 # ---------------------------------------------------------------------------
 # Parlay builder
@@ -115,7 +135,6 @@ class TestCircadianFactoring:
 
 class TestParlayBuilder:
     def _make_leg(self, event_id, odds, win_prob, game_time_utc=None):
-        from src.optimization.parlay_builder import Leg
         return Leg(
             event_id=event_id,
             selection="TeamA ML",
@@ -125,7 +144,6 @@ class TestParlayBuilder:
         )
 
     def test_single_leg_parlay(self):
-        from src.optimization.parlay_builder import ParlayBuilder
         builder = ParlayBuilder(use_circadian=False)
         leg = self._make_leg("E1", odds=2.0, win_prob=0.60)
         parlay = builder.build([leg], sport="NBA", bankroll=1000.0)
@@ -135,7 +153,6 @@ class TestParlayBuilder:
         assert abs(parlay.expected_value - 0.2) < 1e-3
 
     def test_two_leg_parlay_combined_odds(self):
-        from src.optimization.parlay_builder import ParlayBuilder
         builder = ParlayBuilder(use_circadian=False)
         legs = [
             self._make_leg("E1", odds=2.0, win_prob=0.60),
@@ -146,7 +163,6 @@ class TestParlayBuilder:
         assert abs(parlay.win_probability - 0.60 * 0.65) < 1e-6
 
     def test_negative_ev_gives_zero_stake(self):
-        from src.optimization.parlay_builder import ParlayBuilder
         builder = ParlayBuilder(use_circadian=False)
         # Very low win probability → negative EV
         leg = self._make_leg("E1", odds=1.5, win_prob=0.30)
@@ -154,24 +170,21 @@ class TestParlayBuilder:
         assert parlay.recommended_stake == 0.0
 
     def test_stake_capped_at_max_exposure(self):
-        from src.optimization.parlay_builder import ParlayBuilder
         builder = ParlayBuilder(use_circadian=False)
         leg = self._make_leg("E1", odds=5.0, win_prob=0.90)
         parlay = builder.build([leg], sport="NBA", bankroll=1000.0, max_exposure_pct=0.10)
         assert parlay.recommended_stake <= 100.0
 
     def test_build_raises_on_empty_legs(self):
-        from src.optimization.parlay_builder import ParlayBuilder
         builder = ParlayBuilder(use_circadian=False)
         with pytest.raises(ValueError):
             builder.build([], sport="NBA")
 
     def test_circadian_adjustment_applied(self):
-        from src.optimization.parlay_builder import ParlayBuilder, Leg
         builder_on = ParlayBuilder(use_circadian=True)
         builder_off = ParlayBuilder(use_circadian=False)
         # Late-night game (local hour 23) should reduce EV
-        late_game = datetime(2024, 3, 1, 4, 0, tzinfo=timezone.utc)  # 23:00 EST
+        late_game = _BASE_GAME.replace(hour=4)  # 23:00 EST
         leg = Leg(
             event_id="E1", selection="TeamA ML", odds=2.0, win_probability=0.60,
             game_time_utc=late_game, home_tz_offset=-5.0,
@@ -184,14 +197,12 @@ class TestParlayBuilder:
 class TestParlayOptimizer:
     @pytest.mark.asyncio
     async def test_stub_returns_empty_list(self):
-        from src.optimization.parlay_builder import ParlayOptimizer
         opt = ParlayOptimizer(risk_profile="aggressive")
         parlays = await opt.generate_optimized_parlays(sports=["NBA"], min_edge=0.05)
         assert parlays == []
 
     @pytest.mark.asyncio
     async def test_optimizer_with_candidate_legs(self):
-        from src.optimization.parlay_builder import ParlayOptimizer, Leg
         legs = [
             Leg(event_id="E1", selection="Team A ML", odds=2.0, win_probability=0.65),
             Leg(event_id="E2", selection="Team B ML", odds=2.2, win_probability=0.60),
@@ -215,9 +226,21 @@ class TestParlayOptimizer:
         evs = [p.expected_value for p in parlays]
         assert evs == sorted(evs, reverse=True)
 
+    @pytest.mark.asyncio
+    async def test_optimizer_drops_malformed_legs(self):
+        legs = [
+            Leg(event_id="E1", selection="Team A ML", odds=2.0, win_probability=0.65,
+                game_time_utc=_BASE_GAME.replace(hour=20)),
+            Leg(event_id="BAD_ODDS", selection="Team B ML", odds="2.2", win_probability=0.60),
+            Leg(event_id="BAD_TIME", selection="Team C ML", odds=2.1, win_probability=0.60,
+                game_time_utc="tonight"),
+        ]
+        opt = ParlayOptimizer(candidate_legs=legs)
+        parlays = await opt.generate_optimized_parlays(sports=["NBA"], min_edge=0.05, bankroll=1000.0)
+        assert [[leg.event_id for leg in p.legs] for p in parlays] == [["E1"]]
+
     @pytest.mark.asyncio
     async def test_optimizer_filters_by_min_edge(self):
-        from src.optimization.parlay_builder import ParlayOptimizer, Leg
         # Leg with just barely positive EV but below high min_edge threshold
         legs = [
             Leg(event_id="E1", selection="Team A ML", odds=1.5, win_probability=0.55),
@@ -233,8 +256,28 @@ class TestParlayOptimizer:
         )
         assert parlays == []
 
+    @pytest.mark.asyncio
+    async def test_fetch_legs_filters_static_legs_in_order(self):
+        legs = [
+            Leg(event_id="E1", selection="A", odds=2.0, sport="NBA"),
+            Leg(event_id="E2", selection="B", odds=2.0, sport="NFL"),
+            Leg(event_id="E3", selection="C", odds=2.0, sport="nba"),
+            Leg(event_id="E4", selection="D", odds=2.0, sport="GOLF"),
+        ]
+        opt = ParlayOptimizer(candidate_legs=legs, use_circadian=False)
+        fetched = await opt._fetch_legs(["nfl", "NBA"])
+        assert [leg.event_id for leg in fetched] == ["E1", "E2", "E3"]
+
+    @pytest.mark.asyncio
+    async def test_replacing_candidate_legs_rebuilds_index(self):
+        legs = [Leg(event_id="E1", selection="A", odds=2.0, sport="NBA")]
+        opt = ParlayOptimizer(candidate_legs=legs, use_circadian=False)
+        legs.append(Leg(event_id="E2", selection="B", odds=2.0, sport="NBA"))
+        assert [leg.event_id for leg in await opt._fetch_legs(["NBA"])] == ["E1"]
+        opt.candidate_legs = legs + [Leg(event_id="E3", selection="C", odds=2.0, sport="NFL")]
+        assert [leg.event_id for leg in await opt._fetch_legs(["NBA", "NFL"])] == ["E1", "E2", "E3"]
+
     def test_kelly_fraction_by_profile(self):
-        from src.optimization.parlay_builder import ParlayOptimizer
         assert ParlayOptimizer(risk_profile="aggressive")._kelly_fraction == 0.50
         assert ParlayOptimizer(risk_profile="balanced")._kelly_fraction == 0.25
         assert ParlayOptimizer(risk_profile="conservative")._kelly_fraction == 0.10
@@ -247,7 +290,6 @@ class TestParlayOptimizer:
 
 class TestAccountTracker:
     def setup_method(self):
-        from src.account_tracker import AccountTracker
         self.tracker = AccountTracker()
 
     def test_add_and_retrieve_account(self):
@@ -263,6 +305,15 @@ class TestAccountTracker:
         assert acc is not None
         assert acc.name == "FanDuel"
 
+    def test_get_account_by_name_after_remove(self):
+        first = self.tracker.add_account("FanDuel", initial_balance=100.0)
+        second = self.tracker.add_account("fanduel", initial_balance=50.0)
+        assert self.tracker.get_account_by_name("FANDUEL") is first
+        self.tracker.remove_account(first.account_id)
+        assert self.tracker.get_account_by_name("FanDuel") is second
+        self.tracker.remove_account(second.account_id)
+        assert self.tracker.get_account_by_name("FanDuel") is None
+
     def test_total_balance(self):
         self.tracker.add_account("DraftKings", initial_balance=500.0)
         self.tracker.add_account("FanDuel", initial_balance=200.0)
@@ -279,7 +330,6 @@ class TestAccountTracker:
         assert acc.balance == 120.0
 
     def test_withdraw_insufficient_raises(self):
-        from src.account_tracker import SportsbookAccount
         acc = self.tracker.add_account("BetMGM", initial_balance=20.0)
         with pytest.raises(ValueError):
             acc.withdraw(100.0)
@@ -299,6 +349,32 @@ class TestAccountTracker:
         acc.apply_bet_result(stake=20.0, odds=2.0, result="void")
         assert acc.balance == 100.0
 
+    def test_batch_bet_results_match_sequential(self):
+        stakes, odds, results = [20.0, 30.0, 10.0], [2.0, 1.5, 3.0], ["won", "lost", "void"]
+        batched = self.tracker.add_account("Batch", initial_balance=100.0)
+        batched.apply_bet_results_batch(stakes, odds, results)
+        single = self.tracker.add_account("Single", initial_balance=100.0)
+        for s, o, r in zip(stakes, odds, results):
+            single.apply_bet_result(stake=s, odds=o, result=r)
+        assert batched.balance == single.balance == 90.0
+        assert len(batched.transactions) == 3
+        assert batched.summary()["net_betting_pnl"] == single.summary()["net_betting_pnl"]
+
+    def test_max_history_caps_transactions_but_not_totals(self):
+        tracker = AccountTracker(max_history=2)
+        acc = tracker.add_account("Capped", initial_balance=100.0)
+        for _ in range(3):
+            acc.apply_bet_result(stake=10.0, odds=2.0, result="won")
+        assert len(acc.transactions) == 2
+        assert acc.balance == 130.0
+        assert acc.summary()["total_bet_winnings"] == 30.0
+        assert acc.summary()["transaction_count"] == 3
+
+    def test_batch_bet_results_length_mismatch_raises(self):
+        acc = self.tracker.add_account("Batch", initial_balance=100.0)
+        with pytest.raises(ValueError):
+            acc.apply_bet_results_batch([10.0], [2.0, 2.0], ["won"])
+
     def test_account_summary(self):
         acc = self.tracker.add_account("BetMGM", initial_balance=150.0)
         acc.apply_bet_result(stake=25.0, odds=2.5, result="won")
@@ -307,6 +383,23 @@ class TestAccountTracker:
         assert summary["balance"] == 187.5
         assert summary["net_betting_pnl"] == 37.5
 
+    def test_summary_totals_restored_from_db(self):
+        conn = get_connection(":memory:")
+        init_db(conn)
+        tracker = AccountTracker(db_conn=conn)
+        acc = tracker.add_account("DraftKings", initial_balance=100.0)
+        tracker.apply_bet_result(acc.account_id, stake=10.0, odds=3.0, result="won")
+        tracker.apply_bet_result(acc.account_id, stake=5.0, odds=2.0, result="lost")
+        restored = AccountTracker(db_conn=conn).get_account(acc.account_id)
+        summary = restored.summary()
+        assert summary["total_bet_winnings"] == 20.0
+        assert summary["total_bet_losses"] == 5.0
+        assert summary["net_betting_pnl"] == 15.0
+        original = acc.transactions[0]
+        reloaded = restored.transactions[0]
+        assert reloaded.timestamp == pytest.approx(original.timestamp)
+        assert reloaded.timestamp_dt.tzinfo is not None
+
     def test_health_report_flags_low_balance(self):
         self.tracker.add_account("TinyBook", initial_balance=5.0)
         report = self.tracker.health_report()
@@ -318,6 +411,16 @@ class TestAccountTracker:
         report = self.tracker.health_report()
         assert any("limited" in r["flags"] for r in report)
 
+    def test_full_report_matches_separate_reports(self):
+        self.tracker.add_account("TinyBook", initial_balance=5.0)
+        acc = self.tracker.add_account("BigBook", initial_balance=500.0)
+        acc.is_gubbed = True
+        self.tracker.add_account("HealthyBook", initial_balance=200.0)
+        summaries, flagged = self.tracker.full_report()
+        assert summaries == self.tracker.account_summary()
+        assert flagged == self.tracker.health_report()
+        assert len(flagged) == 2
+
     def test_remove_account(self):
         acc = self.tracker.add_account("ToRemove", initial_balance=10.0)
         removed = self.tracker.remove_account(acc.account_id)
@@ -341,50 +444,48 @@ class TestAccountTracker:
 
 class TestBudgetManager:
     def setup_method(self):
-        from src.budget import BudgetManager, BudgetPeriod
         self.bm = BudgetManager()
-        self.BudgetPeriod = BudgetPeriod
 
     def test_no_budget_always_allows_spend(self):
         assert self.bm.can_spend(1000.0) is True
 
     def test_add_daily_budget(self):
-        budget = self.bm.add_budget(self.BudgetPeriod.DAILY, limit=100.0)
+        budget = self.bm.add_budget(BudgetPeriod.DAILY, limit=100.0)
         assert budget.limit == 100.0
 
     def test_invalid_budget_limit_raises(self):
         with pytest.raises(ValueError):
-            self.bm.add_budget(self.BudgetPeriod.DAILY, limit=-10.0)
+            self.bm.add_budget(BudgetPeriod.DAILY, limit=-10.0)
 
     def test_can_spend_within_limit(self):
-        self.bm.add_budget(self.BudgetPeriod.DAILY, limit=100.0)
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=100.0)
         assert self.bm.can_spend(50.0) is True
 
     def test_cannot_spend_exceeding_limit(self):
-        self.bm.add_budget(self.BudgetPeriod.DAILY, limit=100.0)
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=100.0)
         self.bm.record_spend("B1", 80.0, sport="NBA", sportsbook="DK")
         assert self.bm.can_spend(30.0) is False
 
     def test_remaining_after_spend(self):
-        self.bm.add_budget(self.BudgetPeriod.DAILY, limit=100.0)
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=100.0)
         self.bm.record_spend("B1", 40.0)
-        assert self.bm.remaining(self.BudgetPeriod.DAILY) == 60.0
+        assert self.bm.remaining(BudgetPeriod.DAILY) == 60.0
 
     def test_remaining_floors_at_zero(self):
-        self.bm.add_budget(self.BudgetPeriod.DAILY, limit=50.0)
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=50.0)
         self.bm.record_spend("B1", 80.0)
-        assert self.bm.remaining(self.BudgetPeriod.DAILY) == 0.0
+        assert self.bm.remaining(BudgetPeriod.DAILY) == 0.0
 
     def test_spent_in_period_filters_by_sport(self):
-        self.bm.add_budget(self.BudgetPeriod.DAILY, limit=200.0)
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=200.0)
         self.bm.record_spend("B1", 30.0, sport="NBA")
         self.bm.record_spend("B2", 50.0, sport="NFL")
-        assert self.bm.spent_in_period(self.BudgetPeriod.DAILY, sport="NBA") == 30.0
-        assert self.bm.spent_in_period(self.BudgetPeriod.DAILY, sport="NFL") == 50.0
+        assert self.bm.spent_in_period(BudgetPeriod.DAILY, sport="NBA") == 30.0
+        assert self.bm.spent_in_period(BudgetPeriod.DAILY, sport="NFL") == 50.0
 
     def test_sport_sub_limits(self):
         self.bm.add_budget(
-            self.BudgetPeriod.DAILY,
+            BudgetPeriod.DAILY,
             limit=200.0,
             sport_limits={"NBA": 50.0},
         )
@@ -396,21 +497,28 @@ class TestBudgetManager:
         with pytest.raises(ValueError):
             self.bm.record_spend("B1", -10.0)
 
+    def test_record_spends_batch(self):
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=100.0)
+        entries = self.bm.record_spends([("B1", 20.0, "NBA", "DK"), ("B2", 15.0, "NFL", "PP")])
+        assert entries[0].timestamp is entries[1].timestamp
+        assert self.bm.spent_in_period(BudgetPeriod.DAILY) == 35.0
+        with pytest.raises(ValueError):
+            self.bm.record_spends([("B3", 5.0, "NBA", "DK"), ("B4", 0.0, "NBA", "DK")])
+        assert self.bm.spent_in_period(BudgetPeriod.DAILY) == 35.0
+
     def test_weekly_budget_period_start(self):
-        from src.budget import Budget, BudgetPeriod
         budget = Budget(period=BudgetPeriod.WEEKLY, limit=500.0)
         today = date(2024, 3, 6)  # Wednesday
         start = budget.period_start(today)
         assert start.weekday() == 0  # Monday
 
     def test_monthly_budget_period_start(self):
-        from src.budget import Budget, BudgetPeriod
         budget = Budget(period=BudgetPeriod.MONTHLY, limit=2000.0)
         today = date(2024, 3, 15)
         assert budget.period_start(today) == date(2024, 3, 1)
 
     def test_summary_dict(self):
-        self.bm.add_budget(self.BudgetPeriod.DAILY, limit=100.0)
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=100.0)
         self.bm.record_spend("B1", 40.0)
         summary = self.bm.summary()
         assert "daily" in summary
@@ -418,8 +526,48 @@ class TestBudgetManager:
         assert summary["daily"]["remaining"] == 60.0
         assert summary["daily"]["utilisation_pct"] == 40.0
 
+    def test_summary_reflects_writes_after_caching(self):
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=100.0)
+        self.bm.record_spend("B1", 40.0)
+        first = self.bm.summary()
+        first["daily"]["spent"] = -1.0          # callers get their own copy
+        assert self.bm.summary()["daily"]["spent"] == 40.0
+        self.bm.record_spend("B2", 10.0)
+        assert self.bm.summary()["daily"]["spent"] == 50.0
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=200.0)
+        assert self.bm.summary()["daily"]["remaining"] == 150.0
+
+    def test_summary_sport_limits_are_copied(self):
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=100.0, sport_limits={"NBA": 50.0})
+        self.bm.summary()["daily"]["sport_limits"]["NBA"] = 1.0
+        assert self.bm.summary()["daily"]["sport_limits"] == {"NBA": 50.0}
+
     def test_no_budget_remaining_is_inf(self):
-        assert self.bm.remaining(self.BudgetPeriod.DAILY) == float("inf")
+        assert self.bm.remaining(BudgetPeriod.DAILY) == float("inf")
+
+    def test_backdated_spend_lands_in_its_period(self):
+        from datetime import datetime, timezone
+        self.bm.add_budget(BudgetPeriod.WEEKLY, limit=500.0)
+        self.bm.record_spend("B1", 20.0, sport="NBA", timestamp=datetime(2024, 3, 13, tzinfo=timezone.utc))
+        self.bm.record_spend("B2", 30.0, sport="NFL", timestamp=datetime(2024, 3, 6, tzinfo=timezone.utc))
+        self.bm.record_spend("B3", 10.0, sport="NBA", timestamp=datetime(2024, 3, 5, tzinfo=timezone.utc))
+        ref = date(2024, 3, 7)
+        ids = [e.bet_id for e in self.bm.entries_in_period(BudgetPeriod.WEEKLY, reference=ref)]
+        assert ids == ["B3", "B2"]
+        nba = self.bm.entries_in_period(BudgetPeriod.WEEKLY, sport="nba", reference=ref)
+        assert [e.bet_id for e in nba] == ["B3"]
+        assert self.bm.spent_in_period(BudgetPeriod.WEEKLY, reference=ref) == 40.0
+
+    def test_nightly_rollup_keeps_totals(self):
+        from datetime import datetime, timezone
+        self.bm.add_budget(BudgetPeriod.DAILY, limit=500.0)
+        self.bm.record_spend("B1", 25.0, sport="NBA", timestamp=datetime(2024, 1, 10, tzinfo=timezone.utc))
+        self.bm.record_spend("B2", 15.0, sport="NBA", timestamp=datetime(2024, 3, 6, tzinfo=timezone.utc))
+        assert self.bm.nightly_rollup(reference=date(2024, 3, 7)) == 1
+        # A period added after the rollup is still backfilled from daily totals.
+        self.bm.add_budget(BudgetPeriod.MONTHLY, limit=1000.0)
+        assert self.bm.spent_in_period(BudgetPeriod.MONTHLY, reference=date(2024, 1, 20)) == 25.0
+        assert self.bm.spent_in_period(BudgetPeriod.MONTHLY, sport="NBA", reference=date(2024, 3, 7)) == 15.0
 
 
 # ---------------------------------------------------------------------------
@@ -429,12 +577,10 @@ class TestBudgetManager:
 
 class TestConfigNewSettings:
     def test_circadian_enabled_default(self):
-        from src.config import Settings
         s = Settings()
         assert s.CIRCADIAN_ENABLED is True
 
     def test_budget_limits_default_zero(self):
-        from src.config import Settings
         s = Settings()
         assert s.BUDGET_DAILY_LIMIT == 0.0
         assert s.BUDGET_WEEKLY_LIMIT == 0.0